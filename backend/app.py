@@ -1,52 +1,162 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, Response, current_app, request, jsonify, stream_with_context
 from flask_cors import CORS
-from flask_sqlalchemy import SQLAlchemy
 from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from catalog import CatalogStore, CompiledTool, install_version_triggers, read_catalog_version
+from facets import FACETS, FacetIndex, popcount
+from http_cache import catalog_response
+from metrics import Metrics, check_token, span
+from migrate_db import migrate_json_columns
+from parallel import ParallelScorer, SharedCatalog, default_workers
+from models import db, AITool, Role, UserResponse, CATALOG_TABLES, configure_sqlite, load_tool_payloads, tool_roles
+from recorder import ResponseRecorder
+from rollups import DIMENSIONS as STATS_DIMENSIONS, StatsQuery, apply_pending, backfill, install_rollups, \
+    parse_time, read_watermark
+from result_cache import ResultCache
+from startup import StartupReport
+from tool_listing import FILTER_FIELDS, ToolListing
+import fragments
+import heapq
 import os
+import threading
+import vectorized
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import partial
 
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)
+def load_config(app):
+    """Read the settings from the environment (and backend/.env) into app.config."""
+    # Database configuration
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///ai_tools.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Connections pooled per process, and seconds a connection waits for SQLite's write lock
+    app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', '5'))
+    app.config['DB_POOL_MAX_OVERFLOW'] = int(os.getenv('DB_POOL_MAX_OVERFLOW', '10'))
+    app.config['DB_BUSY_TIMEOUT'] = float(os.getenv('DB_BUSY_TIMEOUT', '5'))
+    app.config['SQLITE_JOURNAL_MODE'] = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config['SQLITE_SYNCHRONOUS'] = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
 
-# Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///ai_tools.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Seconds between checks of the catalog version for writes made by other processes
+    app.config['CATALOG_CHECK_INTERVAL'] = float(os.getenv('CATALOG_CHECK_INTERVAL', '1.0'))
+    # Catalogs at least this large are scored with NumPy instead of per-tool Python
+    app.config['VECTORIZE_MIN_TOOLS'] = int(os.getenv('VECTORIZE_MIN_TOOLS', '2000'))
+    # Catalogs at least this large are scored in shards by a pool of PARALLEL_WORKERS processes (below 2 disables it)
+    app.config['PARALLEL_MIN_TOOLS'] = int(os.getenv('PARALLEL_MIN_TOOLS', '500000'))
+    app.config['PARALLEL_WORKERS'] = int(os.getenv('PARALLEL_WORKERS', str(default_workers())))
+    # Catalog read endpoints (/api/tools, /api/roles, /api/categories) are pre-rendered per catalog version
+    app.config['CATALOG_CACHE_MAX_AGE'] = int(os.getenv('CATALOG_CACHE_MAX_AGE', '60'))
+    app.config['CATALOG_CACHE_GZIP_MIN_SIZE'] = int(os.getenv('CATALOG_CACHE_GZIP_MIN_SIZE', '1024'))
+    app.config['RECOMMEND_BATCH_MAX_PROFILES'] = int(os.getenv('RECOMMEND_BATCH_MAX_PROFILES', '10000'))
+    # Encoder of tool fragments and recommendation responses: auto (orjson when installed), orjson or json
+    app.config['JSON_BACKEND'] = os.getenv('JSON_BACKEND', 'auto')
 
-db = SQLAlchemy(app)
+    # Paginated /api/tools and /api/search (?limit=, ?after=; /api/tools also ?fields= and filters)
+    app.config['TOOLS_PAGE_DEFAULT_LIMIT'] = int(os.getenv('TOOLS_PAGE_DEFAULT_LIMIT', '100'))
+    app.config['TOOLS_PAGE_MAX_LIMIT'] = int(os.getenv('TOOLS_PAGE_MAX_LIMIT', '1000'))
+    # Values counted per facet by /api/search when ?facet_limit= is not given
+    app.config['SEARCH_FACET_LIMIT'] = int(os.getenv('SEARCH_FACET_LIMIT', '10'))
 
-# Models
-class AITool(db.Model):
-    __tablename__ = 'ai_tools'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
-    description = db.Column(db.Text, nullable=False)
-    category = db.Column(db.String(50), nullable=False)
-    target_roles = db.Column(db.String(200), nullable=False)  # JSON array
-    skill_level = db.Column(db.String(20), nullable=False)  # beginner, intermediate, advanced
-    use_cases = db.Column(db.Text, nullable=False)  # JSON array
-    pain_points = db.Column(db.Text, nullable=False)  # JSON array
-    pricing_model = db.Column(db.String(50), nullable=False)
-    official_url = db.Column(db.String(200), nullable=False)
-    features = db.Column(db.Text, nullable=False)  # JSON array
-    rating = db.Column(db.Float, default=0.0)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-class UserResponse(db.Model):
-    __tablename__ = 'user_responses'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    role = db.Column(db.String(50), nullable=False)
-    workflow = db.Column(db.String(100), nullable=False)
-    skill_level = db.Column(db.String(20), nullable=False)
-    pain_points = db.Column(db.Text, nullable=False)  # JSON array
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Recommendation results memoized per normalized profile (0 disables the cache)
+    app.config['RECOMMENDATION_CACHE_SIZE'] = int(os.getenv('RECOMMENDATION_CACHE_SIZE', '1024'))
+    app.config['RECOMMENDATION_CACHE_TTL'] = float(os.getenv('RECOMMENDATION_CACHE_TTL', '300'))
+
+    # User response logging: sync, batched (write-behind) or drop (write-behind, drop on overflow)
+    app.config['RESPONSE_LOG_MODE'] = os.getenv('RESPONSE_LOG_MODE', 'batched')
+    app.config['RESPONSE_LOG_BATCH_SIZE'] = int(os.getenv('RESPONSE_LOG_BATCH_SIZE', '200'))
+    app.config['RESPONSE_LOG_FLUSH_INTERVAL'] = float(os.getenv('RESPONSE_LOG_FLUSH_INTERVAL', '0.5'))
+    app.config['RESPONSE_LOG_QUEUE_SIZE'] = int(os.getenv('RESPONSE_LOG_QUEUE_SIZE', '10000'))
+    # /api/stats: most buckets one query may span, and how many values per dimension it returns by default
+    app.config['STATS_MAX_BUCKETS'] = int(os.getenv('STATS_MAX_BUCKETS', '5000'))
+    app.config['STATS_DEFAULT_LIMIT'] = int(os.getenv('STATS_DEFAULT_LIMIT', '10'))
+
+    # Request metrics (Server-Timing header, /api/metrics) and sampled profiling of slow requests;
+    # profiling can be changed at runtime through /api/metrics/profiling when PROFILING_TOKEN is set
+    app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', '1') == '1'
+    app.config['PROFILE_SAMPLE_RATE'] = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    app.config['PROFILE_SLOW_MS'] = float(os.getenv('PROFILE_SLOW_MS', '500'))
+    app.config['PROFILING_TOKEN'] = os.getenv('PROFILING_TOKEN', '')
+
+def _engine_options(config):
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return {}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_POOL_MAX_OVERFLOW'],
+        'connect_args': {'timeout': config['DB_BUSY_TIMEOUT']}
+    }
+
+catalog_store = CatalogStore()
+response_recorder = ResponseRecorder()
+recommendation_cache = ResultCache()
+parallel_scorer = ParallelScorer()
+metrics = Metrics()
+startup_report = StartupReport()
+api = Blueprint('api', __name__)
+
+# Catalog snapshot
+def _load_catalog_tools():
+    return load_tool_payloads(AITool.query.order_by(AITool.id).all())
+
+def _read_catalog_version():
+    with db.engine.connect() as connection:
+        return read_catalog_version(connection)
+
+@event.listens_for(Session, 'after_flush')
+def _track_catalog_writes(session, flush_context):
+    changed = list(session.new) + list(session.dirty) + list(session.deleted)
+    if any(isinstance(obj, AITool) for obj in changed):
+        session.info['catalog_changed'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_catalog(session):
+    # Commits made in this process are picked up on the next request instead of
+    # waiting for the next catalog version poll
+    if session.info.pop('catalog_changed', False):
+        catalog_store.invalidate()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_catalog_writes(session):
+    session.info.pop('catalog_changed', None)
+
+# User response logging
+def _insert_user_responses(app, rows):
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(UserResponse.__table__.insert(), rows)
+            # Same transaction, so a row is never stored without being counted
+            apply_pending(connection)
+
+def _user_response_row(data):
+    return {
+        'role': data['role'],
+        'workflow': data['workflow'],
+        'skill_level': data['skill_level'],
+        'pain_points': json.dumps(data['pain_points']),
+        # Stamped now rather than when the row reaches the database
+        'created_at': datetime.utcnow()
+    }
 
 # Recommendation Engine
 class RecommendationEngine:
+    @staticmethod
+    def prepare_profile(user_response):
+        """
+        Lowercase the user's workflow and pain points once per request
+        instead of once per scored tool.
+        """
+        pain_points = [point.lower() for point in user_response['pain_points']]
+        return {
+            'workflow': user_response['workflow'].lower(),
+            'pain_points': pain_points,
+            'pain_point_set': set(pain_points),
+            'skill_level': user_response['skill_level']
+        }
+
     @staticmethod
     def calculate_score(tool, user_response):
         """
@@ -59,6 +169,18 @@ class RecommendationEngine:
         
         RETURNS: Detailed scoring breakdown for transparency
         """
+        return RecommendationEngine.score_compiled(
+            CompiledTool.from_model(tool),
+            RecommendationEngine.prepare_profile(user_response)
+        )
+
+    @staticmethod
+    def score_compiled(tool, profile):
+        """
+        Score a CompiledTool against a profile from prepare_profile().
+        
+        Same rules as calculate_score, without any JSON decoding or lowercasing.
+        """
         scoring_breakdown = {
             'workflow_match': {'points': 0, 'max': 40, 'achieved': False},
             'challenge_match': {'points': 0, 'max': 40, 'matched_challenges': 0, 'total_challenges': 0},
@@ -67,22 +189,20 @@ class RecommendationEngine:
         }
         
         # WORKFLOW MATCH (40% weight) - Most important factor
-        user_workflow = user_response['workflow'].lower()
-        tool_use_cases = [use_case.lower() for use_case in json.loads(tool.use_cases)]
+        user_workflow = profile['workflow']
         
         # Exact workflow match gets full points
-        if any(user_workflow == use_case for use_case in tool_use_cases):
+        if user_workflow in tool.use_case_set:
             scoring_breakdown['workflow_match']['points'] = 40
             scoring_breakdown['workflow_match']['achieved'] = True
         # Partial/related match gets partial points
-        elif any(user_workflow in use_case or use_case in user_workflow for use_case in tool_use_cases):
+        elif any(user_workflow in use_case or use_case in user_workflow for use_case in tool.use_cases):
             scoring_breakdown['workflow_match']['points'] = 25  # Partial match
             scoring_breakdown['workflow_match']['achieved'] = True
         
         # CHALLENGE MATCH (40% weight) - Addresses pain points
-        user_pain_points = [point.lower() for point in user_response['pain_points']]
-        tool_pain_points = [point.lower() for point in json.loads(tool.pain_points)]
-        matched_challenges = set(user_pain_points) & set(tool_pain_points)
+        user_pain_points = profile['pain_points']
+        matched_challenges = profile['pain_point_set'] & tool.pain_points
         
         scoring_breakdown['challenge_match']['matched_challenges'] = len(matched_challenges)
         scoring_breakdown['challenge_match']['total_challenges'] = len(user_pain_points)
@@ -93,23 +213,9 @@ class RecommendationEngine:
             scoring_breakdown['challenge_match']['points'] = round(challenge_percentage * 40)
         
         # SKILL LEVEL COMPATIBILITY (20% weight) - Ensures appropriateness
-        user_skill = user_response['skill_level']
-        tool_skill = tool.skill_level
-        
-        # Exact match gets full points
-        if tool_skill == user_skill or tool_skill == 'all':
-            scoring_breakdown['skill_compatibility']['points'] = 20
-            scoring_breakdown['skill_compatibility']['compatible'] = True
-        # One level difference gets partial points (tool easier than user)
-        elif (tool_skill == 'beginner' and user_skill == 'intermediate') or \
-             (tool_skill == 'intermediate' and user_skill == 'advanced'):
-            scoring_breakdown['skill_compatibility']['points'] = 15
-            scoring_breakdown['skill_compatibility']['compatible'] = True
-        # Tool harder than user gets minimal points (challenging but possible)
-        elif (tool_skill == 'intermediate' and user_skill == 'beginner') or \
-             (tool_skill == 'advanced' and user_skill == 'intermediate'):
-            scoring_breakdown['skill_compatibility']['points'] = 10
-            scoring_breakdown['skill_compatibility']['compatible'] = False
+        points, compatible = RecommendationEngine.skill_points(tool.skill_level, profile['skill_level'])
+        scoring_breakdown['skill_compatibility']['points'] = points
+        scoring_breakdown['skill_compatibility']['compatible'] = compatible
         
         # Calculate total score
         scoring_breakdown['total_score'] = (
@@ -121,32 +227,156 @@ class RecommendationEngine:
         return scoring_breakdown
     
     @staticmethod
-    def get_recommendations(user_response, limit=10):
+    def skill_points(tool_skill, user_skill):
+        """Return (points, compatible) for a tool's skill level against the user's."""
+        # Exact match gets full points
+        if tool_skill == user_skill or tool_skill == 'all':
+            return 20, True
+        # One level difference gets partial points (tool easier than user)
+        if (tool_skill == 'beginner' and user_skill == 'intermediate') or \
+           (tool_skill == 'intermediate' and user_skill == 'advanced'):
+            return 15, True
+        # Tool harder than user gets minimal points (challenging but possible)
+        if (tool_skill == 'intermediate' and user_skill == 'beginner') or \
+           (tool_skill == 'advanced' and user_skill == 'intermediate'):
+            return 10, False
+        return 0, False
+    
+    @staticmethod
+    def profile_key(user_response, limit=10):
+        """
+        Canonical form of a profile: everything scoring and explanations depend on.
+        
+        Pain points are lowercased and sorted but duplicates are kept, since
+        they count towards total_challenges.
+        """
+        return (
+            user_response['workflow'].lower(),
+            user_response['skill_level'],
+            tuple(sorted(point.lower() for point in user_response['pain_points'])),
+            limit
+        )
+    
+    @staticmethod
+    def get_recommendations(user_response, limit=10, catalog=None, memo=None):
         """
         Get recommendations using the improved scoring algorithm.
         
         Only includes tools with meaningful relevance (>20% score).
         Returns tools sorted by total score (highest first).
+        
+        Skill compatibility alone is worth at most 20 points, so a tool needs a
+        workflow or challenge match to clear the cut. Only the tools found in
+        the catalog's use-case and pain-point indexes are scored, or, for
+        catalogs of VECTORIZE_MIN_TOOLS tools or more, the whole catalog is
+        scored in one NumPy pass.
+        
+        `memo` lets several calls against the same catalog share their
+        workflow and pain point lookups (see get_batch_recommendations).
+        
+        Results are memoized per profile_key() until the catalog changes; the
+        returned list is shared between callers and must not be modified.
         """
-        tools = AITool.query.all()
-        recommendations = []
+        if catalog is None:
+            with span('catalog'):
+                catalog = catalog_store.get()
+        key = RecommendationEngine.profile_key(user_response, limit)
+        recommendations = recommendation_cache.get(key, catalog.version)
+        if recommendations is not None:
+            return recommendations
+        
+        memo = {} if memo is None else memo
+        profile = RecommendationEngine.prepare_profile(user_response)
         
-        for tool in tools:
-            scoring_breakdown = RecommendationEngine.calculate_score(tool, user_response)
-            total_score = scoring_breakdown['total_score']
+        with span('score'):
+            if parallel_scorer.enabled_for(catalog):
+                ranked = RecommendationEngine._rank_vectorized(catalog, profile, limit, memo, parallel=True)
+            elif vectorized.available() and len(catalog) >= current_app.config['VECTORIZE_MIN_TOOLS']:
+                ranked = RecommendationEngine._rank_vectorized(catalog, profile, limit, memo)
+            else:
+                ranked = RecommendationEngine._rank_candidates(catalog, profile, limit, memo)
+        
+        # Explanations are only built for the tools actually returned
+        with span('explain'):
+            recommendations = [{
+                'tool': tool,
+                'score': scoring_breakdown['total_score'],
+                'scoring_breakdown': scoring_breakdown,
+                'explanation': RecommendationEngine.generate_transparent_explanation(tool, user_response, scoring_breakdown)
+            } for tool, scoring_breakdown in ranked]
+        recommendation_cache.put(key, catalog.version, recommendations)
+        return recommendations
+    
+    @staticmethod
+    def _rank_candidates(catalog, profile, limit, memo):
+        """Score the index candidates one by one and keep the top `limit`."""
+        workflow_key = ('workflow_matches', profile['workflow'])
+        if workflow_key not in memo:
+            exact, partial = catalog.workflow_matches(profile['workflow'])
+            memo[workflow_key] = exact | partial
+        pain_point_key = ('pain_point_matches', frozenset(profile['pain_point_set']))
+        if pain_point_key not in memo:
+            memo[pain_point_key] = catalog.pain_point_matches(profile['pain_point_set'])
+        candidates = memo[workflow_key] | memo[pain_point_key]
+        scored = []
+        
+        for position in sorted(candidates):
+            tool = catalog.tools[position]
+            scoring_breakdown = RecommendationEngine.score_compiled(tool, profile)
             
             # Only include tools with meaningful relevance (>20% score)
-            if total_score > 20:
-                recommendations.append({
-                    'tool': tool,
-                    'score': total_score,
-                    'scoring_breakdown': scoring_breakdown,
-                    'explanation': RecommendationEngine.generate_transparent_explanation(tool, user_response, scoring_breakdown)
-                })
+            if scoring_breakdown['total_score'] > 20:
+                scored.append((tool, scoring_breakdown))
         
-        # Sort by score and return top recommendations
-        recommendations.sort(key=lambda x: x['score'], reverse=True)
-        return recommendations[:limit]
+        # Keep the top recommendations by score (ties stay in catalog order)
+        return heapq.nlargest(limit, scored, key=lambda item: item[1]['total_score'])
+    
+    @staticmethod
+    def _rank_vectorized(catalog, profile, limit, memo, parallel=False):
+        """
+        Score the whole catalog with NumPy and pick the top `limit`.
+        
+        With `parallel`, the shards of the catalog are scored by the worker
+        processes of parallel_scorer (in this process if its pool fails).
+        Breakdowns are computed with score_compiled for the winners only, so
+        they are identical to the ones the candidate path produces.
+        """
+        arrays = vectorized.CatalogArrays.for_catalog(catalog)
+        workflow_key = ('workflow_use_cases', profile['workflow'])
+        if workflow_key not in memo:
+            memo[workflow_key] = catalog.workflow_use_cases(profile['workflow'])
+        exact_use_case, partial_use_cases = memo[workflow_key]
+        skill_points = {
+            skill: RecommendationEngine.skill_points(skill, profile['skill_level'])[0]
+            for skill in arrays.skill_levels
+        }
+        query = (exact_use_case, partial_use_cases, profile['pain_point_set'], len(profile['pain_points']), skill_points)
+        positions = parallel_scorer.top_positions(catalog, *query, 20, limit) if parallel else None
+        if positions is None:
+            positions = arrays.top_positions(arrays.total_scores(*query), 20, limit)
+        return [
+            (catalog.tools[position], RecommendationEngine.score_compiled(catalog.tools[position], profile))
+            for position in positions
+        ]
+    
+    @staticmethod
+    def get_batch_recommendations(user_responses, limit=10):
+        """
+        Yield get_recommendations() results for many profiles, in order.
+        
+        All profiles are scored against one catalog snapshot. Profiles with
+        the same profile_key() are only scored once, and the others share the
+        workflow and pain point lookups of earlier profiles.
+        """
+        with span('catalog'):
+            catalog = catalog_store.get()
+        memo = {}
+        results = {}
+        for user_response in user_responses:
+            key = RecommendationEngine.profile_key(user_response, limit)
+            if key not in results:
+                results[key] = RecommendationEngine.get_recommendations(user_response, limit, catalog, memo)
+            yield results[key]
     
     @staticmethod
     def generate_transparent_explanation(tool, user_response, scoring_breakdown):
@@ -186,86 +416,417 @@ class RecommendationEngine:
         return f"This tool {workflow_text}, {challenges_text}, and {skill_text}."
 
 # Routes
-@app.route('/api/tools', methods=['GET'])
+TOOLS_QUERY_ARGS = ['fields', 'after', 'limit', 'format'] + FILTER_FIELDS
+
+def _int_arg(name, default, minimum, maximum=None):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer')
+    if value < minimum or (maximum is not None and value > maximum):
+        bounds = f'between {minimum} and {maximum}' if maximum is not None else f'at least {minimum}'
+        raise ValueError(f'{name} must be {bounds}')
+    return value
+
+@api.route('/api/tools', methods=['GET'])
 def get_tools():
-    tools = AITool.query.all()
-    return jsonify([{
-        'id': tool.id,
-        'name': tool.name,
-        'description': tool.description,
-        'category': tool.category,
-        'target_roles': json.loads(tool.target_roles),
-        'skill_level': tool.skill_level,
-        'use_cases': json.loads(tool.use_cases),
-        'pain_points': json.loads(tool.pain_points),
-        'pricing_model': tool.pricing_model,
-        'official_url': tool.official_url,
-        'features': json.loads(tool.features),
-        'rating': tool.rating
-    } for tool in tools])
-
-@app.route('/api/recommend', methods=['POST'])
+    """
+    Without query arguments, the whole catalog (pre-rendered, see http_cache).
+    
+    With any of ?limit=, ?after=, ?fields=id,name,..., ?category=,
+    ?pricing_model=, ?skill_level= (filters may be repeated), one page:
+    {"tools": [...], "next_after": <id to pass as ?after= | null>}.
+    With ?format=ndjson every matching tool is streamed, one per line.
+    """
+    if not any(arg in request.args for arg in TOOLS_QUERY_ARGS):
+        catalog = catalog_store.get()
+        return catalog_response(
+            catalog, 'tools', lambda: fragments.json_array(fragments.tool_fragment(tool) for tool in catalog.tools)
+        )
+    
+    stream = request.args.get('format') == 'ndjson'
+    try:
+        fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+        listing = ToolListing(fields, {field: request.args.getlist(field) for field in FILTER_FIELDS})
+        after = _int_arg('after', 0, 0)
+        if stream:
+            limit = _int_arg('limit', None, 1)
+        else:
+            limit = _int_arg('limit', current_app.config['TOOLS_PAGE_DEFAULT_LIMIT'], 1, current_app.config['TOOLS_PAGE_MAX_LIMIT'])
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    if stream:
+        def lines():
+            for tool in listing.iter_tools(after, limit):
+                yield fragments.dumps(tool) + b'\n'
+        return Response(stream_with_context(lines()), mimetype='application/x-ndjson')
+    
+    with span('query'):
+        tools, next_after = listing.page(after, limit)
+    with span('serialize'):
+        return jsonify({'tools': tools, 'next_after': next_after})
+
+@api.route('/api/search', methods=['GET'])
+def search_tools():
+    """
+    Tools matching facet filters and a text query, with per-facet counts.
+    
+    Filters: ?category=, ?pricing_model=, ?skill_level=, ?role=, ?use_case=,
+    ?pain_point= (each may be repeated; values of one facet are alternatives,
+    different facets must all match; case-insensitive) and ?q= (every word
+    must appear in the name or description). Paged like /api/tools with
+    ?limit= and ?after=; ?facet_limit= values are counted per facet, each
+    as if that facet's own filter were not set.
+    """
+    try:
+        after = _int_arg('after', 0, 0)
+        limit = _int_arg('limit', current_app.config['TOOLS_PAGE_DEFAULT_LIMIT'], 1, current_app.config['TOOLS_PAGE_MAX_LIMIT'])
+        facet_limit = _int_arg('facet_limit', current_app.config['SEARCH_FACET_LIMIT'], 0, 1000)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    catalog = catalog_store.get()
+    with span('query'):
+        index = FacetIndex.for_catalog(catalog)
+        matches, counts = index.search(
+            {facet: request.args.getlist(facet) for facet in FACETS}, request.args.get('q')
+        )
+        tools, next_after = index.page(matches, after, limit)
+    with span('serialize'):
+        body = fragments.extend_fragment(
+            b'{"tools":' + fragments.json_array(fragments.tool_fragment(tool) for tool in tools) + b'}',
+            {
+                'total': popcount(matches),
+                'next_after': next_after,
+                'facets': {facet: index.top(facet, counts[facet], facet_limit) for facet in FACETS}
+            }
+        )
+        return current_app.response_class(body, mimetype='application/json')
+
+REQUIRED_PROFILE_FIELDS = ['role', 'workflow', 'skill_level', 'pain_points']
+
+def _profile_error(data):
+    """Why a profile cannot be scored or recorded, or None when it is valid."""
+    for field in REQUIRED_PROFILE_FIELDS:
+        if field not in data:
+            return f'Missing required field: {field}'
+    for field in ('role', 'workflow', 'skill_level'):
+        if not isinstance(data[field], str) or not data[field]:
+            return f'{field} must be a non-empty string'
+    pain_points = data['pain_points']
+    if not isinstance(pain_points, list) or not all(isinstance(point, str) for point in pain_points):
+        return 'pain_points must be a list of strings'
+    return None
+
+def _recommendations_json(recommendations):
+    # Tool payloads are encoded once per catalog snapshot; only the scores and
+    # explanations are encoded per response
+    return fragments.json_array(fragments.recommendation_json(rec) for rec in recommendations)
+
+@api.route('/api/recommend', methods=['POST'])
 def get_recommendations():
     data = request.get_json()
     
-    # Validate required fields
-    required_fields = ['role', 'workflow', 'skill_level', 'pain_points']
-    for field in required_fields:
-        if field not in data:
-            return jsonify({'error': f'Missing required field: {field}'}), 400
+    # Validate the profile before it is recorded
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    error = _profile_error(data)
+    if error:
+        return jsonify({'error': error}), 400
     
-    # Save user response
-    user_response = UserResponse(
-        role=data['role'],
-        workflow=data['workflow'],
-        skill_level=data['skill_level'],
-        pain_points=json.dumps(data['pain_points'])
-    )
-    db.session.add(user_response)
-    db.session.commit()
+    # Save user response (written behind the request unless RESPONSE_LOG_MODE is sync)
+    with span('record'):
+        response_recorder.record([_user_response_row(data)])
     
     # Get recommendations
     recommendations = RecommendationEngine.get_recommendations(data)
     
-    return jsonify([{
-        'id': rec['tool'].id,
-        'name': rec['tool'].name,
-        'description': rec['tool'].description,
-        'category': rec['tool'].category,
-        'target_roles': json.loads(rec['tool'].target_roles),
-        'skill_level': rec['tool'].skill_level,
-        'use_cases': json.loads(rec['tool'].use_cases),
-        'pain_points': json.loads(rec['tool'].pain_points),
-        'pricing_model': rec['tool'].pricing_model,
-        'official_url': rec['tool'].official_url,
-        'features': json.loads(rec['tool'].features),
-        'rating': rec['tool'].rating,
-        'score': rec['score'],
-        'scoring_breakdown': rec['scoring_breakdown'],
-        'explanation': rec['explanation']
-    } for rec in recommendations])
-
-@app.route('/api/categories', methods=['GET'])
+    with span('serialize'):
+        return current_app.response_class(_recommendations_json(recommendations), mimetype='application/json')
+
+@api.route('/api/recommend/batch', methods=['POST'])
+def get_batch_recommendations():
+    """
+    Score many profiles in one request.
+    
+    Body: {"profiles": [{role, workflow, skill_level, pain_points}, ...], "limit": 10}
+    
+    Returns one entry per profile, in order: {"index": i, "recommendations": [...]}
+    or {"index": i, "error": "..."} for an invalid profile. With ?format=ndjson
+    the entries are streamed one per line as they are scored.
+    """
+    data = request.get_json(silent=True)
+    profiles = data.get('profiles') if isinstance(data, dict) else None
+    if not isinstance(profiles, list):
+        return jsonify({'error': 'Request body must contain a "profiles" list'}), 400
+    if len(profiles) > current_app.config['RECOMMEND_BATCH_MAX_PROFILES']:
+        return jsonify({'error': f"At most {current_app.config['RECOMMEND_BATCH_MAX_PROFILES']} profiles per batch"}), 400
+    limit = data.get('limit', 10)
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    
+    errors = {}
+    valid = []
+    for index, profile in enumerate(profiles):
+        if not isinstance(profile, dict):
+            errors[index] = 'Profile must be an object'
+            continue
+        error = _profile_error(profile)
+        if error:
+            errors[index] = error
+        else:
+            valid.append(profile)
+    
+    # Save all valid user responses; the recorder inserts them in bulk
+    if valid:
+        with span('record'):
+            response_recorder.record([_user_response_row(profile) for profile in valid])
+    
+    def entries():
+        results = RecommendationEngine.get_batch_recommendations(valid, limit)
+        for index in range(len(profiles)):
+            if index in errors:
+                yield fragments.dumps({'index': index, 'error': errors[index]})
+            else:
+                yield b'{"index":%d,"recommendations":%s}' % (index, _recommendations_json(next(results)))
+    
+    if request.args.get('format') == 'ndjson':
+        def lines():
+            for entry in entries():
+                yield entry + b'\n'
+        return Response(stream_with_context(lines()), mimetype='application/x-ndjson')
+    
+    return current_app.response_class(fragments.json_array(entries()), mimetype='application/json')
+
+@api.route('/api/categories', methods=['GET'])
 def get_categories():
-    categories = db.session.query(AITool.category).distinct().all()
-    return jsonify([cat[0] for cat in categories])
+    def build():
+        categories = db.session.query(AITool.category).distinct().all()
+        return [cat[0] for cat in categories]
+    return catalog_response(catalog_store.get(), 'categories', build)
 
-@app.route('/api/roles', methods=['GET'])
+@api.route('/api/roles', methods=['GET'])
 def get_roles():
-    tools = AITool.query.all()
-    all_roles = set()
-    for tool in tools:
-        roles = json.loads(tool.target_roles)
-        all_roles.update(roles)
-    return jsonify(sorted(list(all_roles)))
-
-@app.route('/api/health', methods=['GET'])
+    def build():
+        # Roles attached to at least one tool, read from the roles name index
+        roles = db.session.query(Role.name).filter(
+            db.session.query(tool_roles).filter(tool_roles.c.role_id == Role.id).exists()
+        ).order_by(Role.name).all()
+        return [role[0] for role in roles]
+    return catalog_response(catalog_store.get(), 'roles', build)
+
+def _collect_app_metrics():
+    catalog = catalog_store.get()
+    cache = recommendation_cache.stats()
+    response_log = response_recorder.stats()
+    return [
+        ('catalog_tools', 'gauge', 'Tools in the catalog snapshot being served.', [({}, len(catalog))]),
+        ('catalog_version', 'gauge', 'Version of the catalog snapshot being served.', [({}, catalog.version)]),
+        ('recommendation_cache_events_total', 'counter', 'Recommendation cache lookups and removals.', [
+            ({'event': event}, cache[event]) for event in ('hits', 'misses', 'evictions', 'expirations', 'invalidations')
+        ]),
+        ('recommendation_cache_entries', 'gauge', 'Recommendation results currently cached.', [({}, cache['size'])]),
+        ('response_log_rows_total', 'counter', 'User responses handed to the response log, by outcome.', [
+            ({'outcome': outcome}, response_log[outcome]) for outcome in ('queued', 'flushed', 'dropped', 'failed')
+        ]),
+        ('response_log_pending_rows', 'gauge', 'User responses waiting to be written.', [({}, response_log['pending'])]),
+    ]
+
+metrics.add_collector(_collect_app_metrics)
+
+@api.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Request latency histograms and counters of this process, in the Prometheus text format."""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@api.route('/api/metrics/profiling', methods=['GET', 'PUT'])
+def profiling():
+    """
+    Sampled cProfile of slow requests.
+    
+    Only available when PROFILING_TOKEN is set, to requests sending it in the
+    X-Profiling-Token header. GET returns the settings and the profiles kept;
+    PUT {"sample_rate": 0.05, "slow_ms": 200} changes the settings of the
+    process that handles it (sample_rate 0 turns profiling off).
+    """
+    if not check_token(current_app.config['PROFILING_TOKEN']):
+        return jsonify({'error': 'Not found'}), 404
+    if request.method == 'PUT':
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        try:
+            metrics.configure_profiling(
+                float(data.get('sample_rate', metrics.profile_sample_rate)),
+                float(data.get('slow_ms', metrics.profile_slow_ms))
+            )
+        except (TypeError, ValueError) as error:
+            return jsonify({'error': str(error)}), 400
+    return jsonify({
+        'sample_rate': metrics.profile_sample_rate,
+        'slow_ms': metrics.profile_slow_ms,
+        'profiles': metrics.profiles()
+    })
+
+@api.route('/api/stats', methods=['GET'])
+def get_stats():
+    """
+    Response counts from the hourly and daily rollups (see rollups.py).
+    
+    ?granularity=hour|day (default day), ?from= and ?to= as ISO dates or
+    times in UTC (default the last 7 days, or 24 hours when hourly),
+    ?dimension= role, workflow, skill_level or pain_point (repeatable,
+    default all) and ?limit= values per dimension. The series counts all
+    responses per bucket, or with ?value= (and one dimension) the responses
+    with that value. Buckets without responses are left out.
+    """
+    try:
+        granularity = request.args.get('granularity', 'day')
+        end = parse_time(request.args['to']) if 'to' in request.args else datetime.utcnow()
+        if 'from' in request.args:
+            start = parse_time(request.args['from'])
+        else:
+            start = end - (timedelta(hours=24) if granularity == 'hour' else timedelta(days=7))
+        query = StatsQuery(granularity, start, end)
+        if query.buckets > current_app.config['STATS_MAX_BUCKETS']:
+            raise ValueError(f"At most {current_app.config['STATS_MAX_BUCKETS']} {granularity} buckets per query")
+        dimensions = request.args.getlist('dimension') or STATS_DIMENSIONS
+        unknown = [dimension for dimension in dimensions if dimension not in STATS_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown dimension {unknown[0]!r}, expected one of {', '.join(STATS_DIMENSIONS)}")
+        value = request.args.get('value')
+        if value is not None and len(dimensions) != 1:
+            raise ValueError('value needs exactly one dimension')
+        limit = _int_arg('limit', current_app.config['STATS_DEFAULT_LIMIT'], 1, 1000)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    with span('query'):
+        with db.engine.connect() as connection:
+            if value is None:
+                series = query.series(connection)
+            else:
+                series = query.series(connection, dimensions[0], value.strip())
+            top = {dimension: query.top(connection, dimension, limit) for dimension in dimensions}
+            watermark = read_watermark(connection)
+    return jsonify({
+        'granularity': granularity,
+        'from': query.start.isoformat(),
+        'to': query.end.isoformat(),
+        'total': sum(count for _, count in series),
+        'series': [{'bucket': bucket, 'count': count} for bucket, count in series],
+        'dimensions': {
+            dimension: [{'value': value, 'count': count} for value, count in counts]
+            for dimension, counts in top.items()
+        },
+        'last_response_id': watermark
+    })
+
+@api.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat()})
+    """Liveness and readiness: 503 with status "starting" while this process is warming up."""
+    ready = startup_report.ready
+    return jsonify({
+        'status': 'healthy' if ready else 'starting',
+        'timestamp': datetime.utcnow().isoformat(),
+        'startup': startup_report.as_dict(),
+        'response_log': response_recorder.stats(),
+        'recommendation_cache': recommendation_cache.stats()
+    }), 200 if ready else 503
+
+# Application factory
+def init_database(app):
+    """Create or migrate the schema, then roll up the responses not counted yet."""
+    with app.app_context():
+        configure_sqlite(db.engine, app.config['SQLITE_JOURNAL_MODE'], app.config['SQLITE_SYNCHRONOUS'])
+        migrate_json_columns(db.engine)
+        db.create_all()
+        with db.engine.begin() as connection:
+            install_version_triggers(connection, CATALOG_TABLES)
+            install_rollups(connection)
+        # Counts rows recorded before the rollups existed (or by other writers); a no-op once caught up
+        with startup_report.phase('rollup_backfill'):
+            backfill(db.engine)
+
+def create_app(config=None, init_db=True):
+    """
+    Build the application with the settings of load_config(), overridden by `config`.
+    
+    The process-wide helpers (catalog_store, response_recorder, ...) are
+    configured for the new application, dropping what they held for a
+    previous one (responses still queued for it are written first). With
+    `init_db`, the schema is created or migrated before returning.
+    """
+    app = Flask(__name__)
+    CORS(app)
+    with startup_report.phase('config'):
+        load_config(app)
+        app.config.update(config or {})
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', _engine_options(app.config))
+        db.init_app(app)
+        fragments.configure(app.config['JSON_BACKEND'])
+        recommendation_cache.init_app(app)
+        parallel_scorer.init_app(app)
+        metrics.init_app(app)
+        catalog_store.init_app(app, _load_catalog_tools, _read_catalog_version)
+        response_recorder.init_app(app, partial(_insert_user_responses, app))
+        app.register_blueprint(api)
+    if init_db:
+        with startup_report.phase('database'):
+            init_database(app)
+    return app
+
+def warm_up(app):
+    """
+    Build what the first requests would otherwise wait for.
+    
+    Compiles the catalog, its use case matcher, scoring arrays (in shared
+    memory too when parallel scoring is on) and facet index, and pre-renders
+    the catalog endpoints. /api/health reports the
+    process as starting until this returns.
+    """
+    startup_report.begin_warm_up()
+    try:
+        with app.app_context():
+            with startup_report.phase('catalog'):
+                catalog = catalog_store.get()
+            with startup_report.phase('indexes'):
+                catalog.workflow_use_cases('')
+                if vectorized.available() and len(catalog) >= app.config['VECTORIZE_MIN_TOOLS']:
+                    vectorized.CatalogArrays.for_catalog(catalog)
+                if parallel_scorer.enabled_for(catalog):
+                    # Built before a preforking server forks, so its workers share one block
+                    SharedCatalog.for_catalog(catalog, parallel_scorer.workers)
+                FacetIndex.for_catalog(catalog)
+        with startup_report.phase('render'):
+            # Called directly rather than through a test client, so warm-up stays out of the request metrics
+            for endpoint in ('api.get_tools', 'api.get_categories', 'api.get_roles'):
+                with app.test_request_context():
+                    app.view_functions[endpoint]()
+    finally:
+        startup_report.mark_ready()
+
+_default_app = None
+_default_app_lock = threading.Lock()
 
-# Initialize database
-with app.app_context():
-    db.create_all()
+def __getattr__(name):
+    # `from app import app` (init_db.py, the benchmarks) creates the default application on first use,
+    # so importing this module does not touch the database
+    global _default_app
+    if name == 'app':
+        with _default_app_lock:
+            if _default_app is None:
+                _default_app = create_app()
+        return _default_app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 if __name__ == '__main__':
+    # Development server with the reloader; production runs gunicorn (see gunicorn.conf.py)
+    app = create_app()
+    startup_report.begin_warm_up()
+    threading.Thread(target=warm_up, args=(app,), name='warm-up', daemon=True).start()
     app.run(debug=True, port=5001)
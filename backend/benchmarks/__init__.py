@@ -0,0 +1,8 @@
+"""
+Reproducible benchmarks of the recommendation API against synthetic catalogs.
+
+Run from the backend directory:
+
+    python -m benchmarks run --sizes 1000 10000 100000 --output results.json
+    python -m benchmarks run --compare results.json
+"""
@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from benchmarks.runner import SCENARIOS, build_catalog, run_scenarios
+from benchmarks.synthetic import generate_profiles, generate_tools, write_jsonl
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def _child(command, database, args):
+    """Run `python -m benchmarks <command>` with DATABASE_URL pointing at `database`."""
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{os.path.abspath(database)}')
+    subprocess.run([sys.executable, '-m', 'benchmarks', command] + args, cwd=BACKEND_DIR, env=env, check=True)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    os.makedirs(args.workdir, exist_ok=True)
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'requests': args.requests
+        },
+        'results': {}
+    }
+    for size in args.sizes:
+        # Generated catalogs are kept in the work directory and reused by later runs
+        template = os.path.join(args.workdir, f'catalog-{size}-seed{args.seed}.db')
+        if not os.path.exists(template):
+            print(f'Generating a catalog of {size:,} tools...', file=sys.stderr)
+            _child('build', template + '.partial', ['--size', str(size), '--seed', str(args.seed)])
+            os.replace(template + '.partial', template)
+
+        # Each run measures a fresh copy, so logged user responses do not accumulate
+        database = os.path.join(args.workdir, f'run-{size}.db')
+        shutil.copyfile(template, database)
+        result_path = database + '.json'
+        print(f'Benchmarking {size:,} tools...', file=sys.stderr)
+        try:
+            _child('measure', database, [
+                '--requests', str(args.requests), '--seed', str(args.seed), '--result', result_path
+            ] + (['--scenarios'] + args.scenarios if args.scenarios else []))
+            with open(result_path, encoding='utf-8') as handle:
+                report['results'][str(size)] = json.load(handle)
+        finally:
+            for path in (database, database + '-wal', database + '-shm', result_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        print(f'Results written to {args.output}')
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            regressions = compare(json.load(handle), report, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+def print_report(report):
+    print(f"{'size':>9}  {'scenario':<24}{'items/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'traced MB':>11}")
+    for size, result in report['results'].items():
+        for name, stats in result['scenarios'].items():
+            latency = stats['latency_ms']
+            print(
+                f"{int(size):>9,}  {name:<24}{stats['throughput_per_second']:>12,.1f}"
+                f"{latency['p50']:>10.2f}{latency['p95']:>10.2f}{latency['p99']:>10.2f}{stats['peak_traced_mb']:>11.1f}"
+            )
+        print(f"{int(size):>9,}  peak RSS {result['peak_rss_mb']} MB")
+
+
+def compare(baseline, report, threshold):
+    """
+    Print how each scenario changed against a previous results file.
+
+    A scenario regressed when its p95 latency rose, or its throughput fell, by
+    more than `threshold` percent. Returns the list of regressions.
+    """
+    def change(old, new):
+        return (new - old) / old * 100 if old else 0.0
+
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('git_commit') or 'baseline'} ({baseline['meta']['created_at']}):")
+    for size, result in report['results'].items():
+        previous = baseline['results'].get(size)
+        if previous is None:
+            continue
+        for name, stats in result['scenarios'].items():
+            old = previous['scenarios'].get(name)
+            if old is None:
+                continue
+            p95 = change(old['latency_ms']['p95'], stats['latency_ms']['p95'])
+            throughput = change(old['throughput_per_second'], stats['throughput_per_second'])
+            regressed = p95 > threshold or throughput < -threshold
+            if regressed:
+                regressions.append((size, name))
+            print(
+                f"{int(size):>9,}  {name:<24} p95 {p95:+7.1f}%  throughput {throughput:+7.1f}%"
+                f"{'  REGRESSION' if regressed else ''}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description='Benchmark the recommendation API against synthetic catalogs.'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='generate catalogs (once) and benchmark them')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='catalog sizes, e.g. 1000 10000 100000 1000000')
+    run_parser.add_argument('--requests', type=int, default=200, help='profiles / requests per scenario')
+    run_parser.add_argument('--seed', type=int, default=42, help='seed of the generated catalogs and profiles')
+    run_parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, help='run only these scenarios')
+    run_parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'ai-tools-benchmarks'),
+                            help='where generated catalogs are kept between runs')
+    run_parser.add_argument('--output', help='write the results to this JSON file')
+    run_parser.add_argument('--compare', help='compare with a previous results file; exits with 1 on regressions')
+    run_parser.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent')
+
+    generate_parser = commands.add_parser('generate', help='write a synthetic catalog (and profiles) as JSON Lines')
+    generate_parser.add_argument('--size', type=int, required=True)
+    generate_parser.add_argument('--seed', type=int, default=42)
+    generate_parser.add_argument('--output', required=True, help='tools file, importable with init_db.py')
+    generate_parser.add_argument('--profiles', help='also write this many profiles ...', type=int)
+    generate_parser.add_argument('--profiles-output', help='... to this JSON Lines file')
+
+    # Used by `run`, in child processes with DATABASE_URL set
+    build_parser = commands.add_parser('build', help='import a synthetic catalog into DATABASE_URL')
+    build_parser.add_argument('--size', type=int, required=True)
+    build_parser.add_argument('--seed', type=int, default=42)
+    measure_parser = commands.add_parser('measure', help='run the scenarios against DATABASE_URL')
+    measure_parser.add_argument('--requests', type=int, default=200)
+    measure_parser.add_argument('--seed', type=int, default=42)
+    measure_parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS)
+    measure_parser.add_argument('--result', required=True, help='JSON file to write the results to')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    elif args.command == 'generate':
+        write_jsonl(generate_tools(args.size, args.seed), args.output)
+        if args.profiles:
+            write_jsonl(generate_profiles(args.profiles, args.seed), args.profiles_output or 'profiles.jsonl')
+    elif args.command == 'build':
+        report = build_catalog(args.size, args.seed)
+        print(f'Imported catalog: {report.summary()}', file=sys.stderr)
+    elif args.command == 'measure':
+        result = run_scenarios(args.requests, args.seed, args.scenarios)
+        with open(args.result, 'w', encoding='utf-8') as handle:
+            json.dump(result, handle)
+
+
+if __name__ == '__main__':
+    main()
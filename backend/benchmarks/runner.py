@@ -0,0 +1,185 @@
+"""
+Benchmark scenarios, run inside a process whose DATABASE_URL points at a synthetic catalog.
+
+`app` reads its configuration when it is imported, so these functions import
+it lazily; __main__ runs each catalog size in its own child process.
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from benchmarks.synthetic import generate_profiles, generate_tools
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCENARIOS = [
+    'catalog_load', 'engine_recommend', 'engine_recommend_cached', 'engine_batch',
+    'api_recommend', 'api_tools', 'api_tools_page', 'api_roles'
+]
+
+
+def percentile(sorted_values, fraction):
+    """Linear interpolation between the closest ranks of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * fraction
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def measure(call, iterations, items_per_call=1, warmup=3, memory_iterations=20):
+    """
+    Time `call(i)` for i in range(iterations) and return its statistics.
+
+    Latencies come from a pass without tracemalloc (which slows allocation
+    heavy code several times over); peak traced memory from a second, shorter
+    pass of `memory_iterations` calls. Throughput is in items per second.
+    """
+    for index in range(min(warmup, iterations)):
+        call(index)
+
+    gc.collect()
+    latencies = []
+    started = time.perf_counter()
+    for index in range(iterations):
+        call_started = time.perf_counter()
+        call(index)
+        latencies.append(time.perf_counter() - call_started)
+    total = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for index in range(min(memory_iterations, iterations)):
+            call(index)
+        peak_traced = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'seconds': round(total, 4),
+        'throughput_per_second': round(iterations * items_per_call / total, 2) if total else None,
+        'latency_ms': {
+            'mean': round(total / iterations * 1000, 3),
+            'p50': round(percentile(latencies, 0.50) * 1000, 3),
+            'p95': round(percentile(latencies, 0.95) * 1000, 3),
+            'p99': round(percentile(latencies, 0.99) * 1000, 3),
+            'max': round(latencies[-1] * 1000, 3)
+        },
+        'peak_traced_mb': round(peak_traced / (1024 * 1024), 2),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def build_catalog(size, seed):
+    """Create the schema at DATABASE_URL and import a synthetic catalog of `size` tools."""
+    from app import app, db
+    from importer import CatalogImporter, print_progress
+
+    with app.app_context():
+        raw_connection = db.engine.raw_connection()
+        try:
+            importer = CatalogImporter(raw_connection.driver_connection, progress=print_progress)
+            sources = (('synthetic', number, record, None)
+                       for number, record in enumerate(generate_tools(size, seed), start=1))
+            report = importer.run(sources)
+            # The import leaves the database in WAL mode; fold the log back in so
+            # the file can be copied on its own
+            raw_connection.driver_connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        finally:
+            raw_connection.close()
+        db.engine.dispose()
+    sys.stderr.write('\n')
+    return report
+
+
+def run_scenarios(requests, seed, scenarios=None, limit=10):
+    """Run the selected scenarios (all of SCENARIOS by default) against the catalog at DATABASE_URL."""
+    from app import app, catalog_store, recommendation_cache, response_recorder, RecommendationEngine
+    from catalog import CompiledCatalog
+
+    scenarios = scenarios or SCENARIOS
+    profiles = generate_profiles(requests, seed)
+    client = app.test_client()
+    results = {}
+
+    def get(path):
+        response = client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f'GET {path} returned {response.status_code}')
+        response.close()
+
+    def post(path, body):
+        response = client.post(path, json=body)
+        if response.status_code != 200:
+            raise RuntimeError(f'POST {path} returned {response.status_code}')
+
+    def compile_catalog(index):
+        # Load and compile a new snapshot without replacing the one being served
+        CompiledCatalog(catalog_store.loader(), catalog.version)
+
+    with app.app_context():
+        catalog = catalog_store.get()
+        size = len(catalog)
+        ids = [tool.id for tool in catalog.tools]
+        cache_size = recommendation_cache.max_size
+
+        if 'catalog_load' in scenarios:
+            results['catalog_load'] = measure(compile_catalog, 3, warmup=0, memory_iterations=1)
+
+        # Uncached scoring: every call ranks the whole catalog
+        recommendation_cache.max_size = 0
+        if 'engine_recommend' in scenarios:
+            results['engine_recommend'] = measure(
+                lambda index: RecommendationEngine.get_recommendations(profiles[index], limit), requests
+            )
+        if 'engine_batch' in scenarios:
+            results['engine_batch'] = measure(
+                lambda index: list(RecommendationEngine.get_batch_recommendations(profiles, limit)),
+                3, items_per_call=len(profiles), warmup=1, memory_iterations=1
+            )
+        if 'api_recommend' in scenarios:
+            results['api_recommend'] = measure(lambda index: post('/api/recommend', profiles[index]), requests)
+
+        recommendation_cache.max_size = cache_size
+        if 'engine_recommend_cached' in scenarios and cache_size:
+            recommendation_cache.clear()
+            for profile in profiles:
+                RecommendationEngine.get_recommendations(profile, limit)
+            results['engine_recommend_cached'] = measure(
+                lambda index: RecommendationEngine.get_recommendations(profiles[index], limit), requests
+            )
+
+        if 'api_tools' in scenarios:
+            results['api_tools'] = measure(lambda index: get('/api/tools'), min(requests, 50), memory_iterations=3)
+        if 'api_tools_page' in scenarios:
+            # Deterministic spread of page starts over the whole id range
+            starts = [ids[(index * 7919) % len(ids)] if ids else 0 for index in range(requests)]
+            results['api_tools_page'] = measure(
+                lambda index: get(f'/api/tools?limit=100&after={starts[index]}'), requests
+            )
+        if 'api_roles' in scenarios:
+            results['api_roles'] = measure(lambda index: get('/api/roles'), requests)
+
+        config = {
+            key: app.config[key] for key in (
+                'VECTORIZE_MIN_TOOLS', 'RECOMMENDATION_CACHE_SIZE', 'RECOMMENDATION_CACHE_TTL', 'RESPONSE_LOG_MODE'
+            )
+        }
+
+    response_recorder.flush()
+    return {'catalog_size': size, 'config': config, 'scenarios': results, 'peak_rss_mb': peak_rss_mb()}
@@ -0,0 +1,150 @@
+import itertools
+import json
+import random
+
+ROLES = [
+    'Developer', 'Software Engineer', 'Full Stack Developer', 'Data Scientist', 'Data Analyst',
+    'Writer', 'Content Creator', 'Marketer', 'Designer', 'Artist', 'Student', 'Researcher',
+    'Product Manager', 'Project Manager', 'Business Analyst', 'Teacher', 'Sales Representative',
+    'Customer Support', 'Video Editor', 'Photographer', 'Musician', 'Podcaster', 'Entrepreneur',
+    'Consultant', 'Lawyer', 'Accountant', 'Recruiter', 'HR Manager', 'Social Media Manager',
+    'SEO Specialist', 'Copywriter', 'Journalist', 'Translator', 'DevOps Engineer',
+    'Security Engineer', 'QA Engineer', 'UX Researcher', 'Game Developer', 'Architect', 'Doctor'
+]
+CATEGORIES = [
+    'Text Generation', 'Code Assistance', 'Image Generation', 'Productivity', 'Video Generation',
+    'Audio & Music', 'Data Analysis', 'Research', 'Marketing', 'Design', 'Education', 'Customer Service',
+    'Sales', 'Writing', 'Translation', 'Transcription', 'Presentation', 'Search', 'Automation',
+    'Security', 'Legal', 'Finance', 'Healthcare', 'Recruiting'
+]
+SKILL_LEVELS = ['beginner', 'intermediate', 'advanced', 'all']
+SKILL_WEIGHTS = [35, 35, 15, 15]
+PRICING_MODELS = ['Free', 'Freemium', 'Subscription', 'Paid', 'Enterprise']
+PRICING_WEIGHTS = [15, 45, 30, 5, 5]
+
+SUBJECTS = [
+    'code', 'blog', 'image', 'video', 'audio', 'data', 'report', 'email', 'meeting', 'document',
+    'presentation', 'social media', 'marketing', 'sales', 'customer', 'research', 'product', 'design',
+    'music', 'podcast', 'website', 'app', 'database', 'spreadsheet', 'contract', 'invoice', 'lesson',
+    'course', 'interview', 'survey', 'ad', 'newsletter', 'script', 'logo', 'brand', 'seo', 'test',
+    'api', 'documentation', 'translation', 'note', 'task', 'calendar', 'chat', 'ticket', 'campaign',
+    'story', 'article', 'resume', 'proposal', 'budget', 'dashboard', 'model', 'prototype', 'wireframe',
+    'diagram', 'photo', 'voice', 'subtitle', 'workflow'
+]
+ACTIONS = [
+    'writing', 'generation', 'editing', 'review', 'analysis', 'creation', 'summarization', 'planning',
+    'automation', 'optimization', 'translation', 'transcription', 'design', 'research', 'management',
+    'debugging', 'refactoring', 'testing', 'visualization', 'scheduling', 'tracking', 'reporting',
+    'brainstorming', 'proofreading', 'enhancement'
+]
+PAIN_TEMPLATES = [
+    'Slow {}', 'Manual {}', 'Time-consuming {}', 'Expensive {}', 'Inconsistent {}', 'Repetitive {}',
+    'Error-prone {}', 'Complex {}', '{} backlog', 'Poor {} quality', 'Learning {} tools', '{} bottlenecks'
+]
+FEATURE_TEMPLATES = [
+    '{} templates', '{} API', 'Real-time {}', 'Batch {}', '{} integration', 'Collaborative {}',
+    'Custom {}', '{} export', 'Automated {}'
+]
+NAME_PARTS = ['Nova', 'Quill', 'Pixel', 'Sync', 'Mind', 'Flow', 'Spark', 'Logic', 'Echo', 'Forge',
+              'Lens', 'Pilot', 'Craft', 'Wave', 'Scribe', 'Vector', 'Atlas', 'Bolt', 'Cortex', 'Muse']
+
+
+def _capitalize(text):
+    # str.capitalize() would also lowercase "API"
+    return text[0].upper() + text[1:]
+
+
+class ZipfSampler:
+    """Draw items with probability proportional to 1 / rank ** exponent, as tag usage is in real catalogs."""
+
+    def __init__(self, items, exponent, rng):
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cum_weights = list(itertools.accumulate(1.0 / rank ** exponent for rank in range(1, len(self.items) + 1)))
+        self.rng = rng
+
+    def sample(self, count):
+        """Up to `count` distinct items (popular items may be drawn twice and are then kept once)."""
+        drawn = self.rng.choices(self.items, cum_weights=self.cum_weights, k=count + count // 2)
+        return list(dict.fromkeys(drawn))[:count]
+
+
+class Vocabulary:
+    """The tag vocabularies of a synthetic catalog, shared by its tools and the profiles run against it."""
+
+    def __init__(self, seed):
+        rng = random.Random(seed)
+        use_cases = [_capitalize(f'{subject} {action}') for subject in SUBJECTS for action in ACTIONS]
+        pain_points = [_capitalize(template.format(subject)) for template in PAIN_TEMPLATES for subject in SUBJECTS]
+        features = [_capitalize(template.format(subject)) for template in FEATURE_TEMPLATES for subject in SUBJECTS]
+        self.roles = ZipfSampler(ROLES, 1.0, rng)
+        self.categories = ZipfSampler(CATEGORIES, 0.8, rng)
+        self.use_cases = ZipfSampler(use_cases, 1.1, rng)
+        self.pain_points = ZipfSampler(pain_points, 1.1, rng)
+        self.features = ZipfSampler(features, 1.0, rng)
+
+
+def generate_tools(count, seed=0):
+    """
+    Yield `count` tool records in the format read by importer.read_records.
+
+    The same (count, seed) always produces the same catalog. Tags follow Zipf
+    distributions over vocabularies of a few hundred to ~1500 names, so a
+    handful of use cases and pain points are shared by many tools while most
+    appear on few.
+    """
+    vocabulary = Vocabulary(seed)
+    rng = random.Random(seed + 1)
+    for number in range(1, count + 1):
+        name = f'{rng.choice(NAME_PARTS)}{rng.choice(NAME_PARTS)} {number}'
+        category = vocabulary.categories.sample(1)[0]
+        yield {
+            'name': name,
+            'description': f'{name} is a {category.lower()} tool for {vocabulary.use_cases.sample(1)[0].lower()}.',
+            'category': category,
+            'target_roles': vocabulary.roles.sample(rng.randint(1, 5)),
+            'skill_level': rng.choices(SKILL_LEVELS, weights=SKILL_WEIGHTS)[0],
+            'use_cases': vocabulary.use_cases.sample(rng.randint(2, 6)),
+            'pain_points': vocabulary.pain_points.sample(rng.randint(2, 5)),
+            'pricing_model': rng.choices(PRICING_MODELS, weights=PRICING_WEIGHTS)[0],
+            'official_url': f'https://{name.split()[0].lower()}-{number}.example.com',
+            'features': vocabulary.features.sample(rng.randint(2, 6)),
+            'rating': round(min(5.0, max(1.0, rng.gauss(4.0, 0.5))), 1)
+        }
+
+
+def generate_profiles(count, seed=0):
+    """
+    Return `count` user profiles (the /api/recommend request body) for a catalog generated with `seed`.
+
+    Most workflows are catalog use cases (popular ones more often), some only
+    contain one and a few match nothing, so exact, partial and empty workflow
+    matches are all exercised.
+    """
+    vocabulary = Vocabulary(seed)
+    rng = random.Random(seed + 2)
+    profiles = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.7:
+            workflow = vocabulary.use_cases.sample(1)[0]
+        elif kind < 0.9:
+            workflow = f'Daily {vocabulary.use_cases.sample(1)[0].lower()} work'
+        else:
+            workflow = f'{rng.choice(NAME_PARTS)} {rng.choice(ACTIONS)}'
+        pain_points = vocabulary.pain_points.sample(rng.randint(1, 4))
+        if rng.random() < 0.2:
+            pain_points.append('Something else entirely')
+        profiles.append({
+            'role': vocabulary.roles.sample(1)[0],
+            'workflow': workflow,
+            'skill_level': rng.choice(SKILL_LEVELS[:3]),
+            'pain_points': pain_points
+        })
+    return profiles
+
+
+def write_jsonl(records, path):
+    with open(path, 'w', encoding='utf-8') as handle:
+        for record in records:
+            handle.write(json.dumps(record) + '\n')
@@ -0,0 +1,182 @@
+import threading
+import time
+from matching import UseCaseMatcher
+
+
+class CompiledTool:
+    """
+    Pre-parsed view of a single AITool row.
+
+    Built from the tool's API payload; the fields used for scoring are
+    lowercased up front, so scoring never touches the database or str.lower.
+    `fragment` holds the encoded payload once fragments.tool_fragment() has
+    been asked for it.
+    """
+    __slots__ = ('position', 'id', 'skill_level', 'use_cases', 'use_case_set', 'pain_points', 'payload', 'fragment')
+
+    def __init__(self, position, payload):
+        self.position = position
+        self.id = payload['id']
+        self.skill_level = payload['skill_level']
+        self.use_cases = tuple(use_case.lower() for use_case in payload['use_cases'])
+        self.use_case_set = frozenset(self.use_cases)
+        self.pain_points = frozenset(point.lower() for point in payload['pain_points'])
+        self.payload = payload
+        self.fragment = None
+
+    @classmethod
+    def from_model(cls, tool, position=0):
+        return cls(position, tool.to_dict())
+
+
+class CompiledCatalog:
+    """
+    Immutable snapshot of the catalog at a given catalog version.
+
+    Tools are kept in database order (their position doubles as the
+    tie-breaker when scores are equal) together with inverted indexes
+    from lowercased use cases and pain points to tool positions.
+    """
+
+    def __init__(self, payloads, version):
+        self.version = version
+        self.tools = tuple(CompiledTool(position, payload) for position, payload in enumerate(payloads))
+
+        use_case_index = {}
+        pain_point_index = {}
+        for tool in self.tools:
+            for use_case in tool.use_case_set:
+                use_case_index.setdefault(use_case, []).append(tool.position)
+            for point in tool.pain_points:
+                pain_point_index.setdefault(point, []).append(tool.position)
+
+        self.use_case_index = {key: tuple(positions) for key, positions in use_case_index.items()}
+        self.pain_point_index = {key: tuple(positions) for key, positions in pain_point_index.items()}
+
+        # Structures derived from this snapshot (numeric arrays, matchers, ...)
+        # are built on first use and live exactly as long as the snapshot
+        self.derived = {}
+
+    def __len__(self):
+        return len(self.tools)
+
+    def workflow_use_cases(self, workflow):
+        """
+        Return (exact, partial) catalog use cases for a lowercased workflow.
+
+        `exact` is the workflow itself when some tool lists it, else None;
+        `partial` holds the other use cases that contain, or are contained in,
+        the workflow. Answered by a UseCaseMatcher built on first use.
+        """
+        matcher = self.derived.get('use_case_matcher')
+        if matcher is None:
+            matcher = self.derived['use_case_matcher'] = UseCaseMatcher(self.use_case_index)
+        return matcher.match(workflow)
+
+    def workflow_matches(self, workflow):
+        """
+        Return (exact, partial) sets of tool positions for a lowercased workflow.
+
+        A tool lands in `partial` when one of its use cases contains, or is
+        contained in, the workflow and none of them is equal to it.
+        """
+        exact_use_case, partial_use_cases = self.workflow_use_cases(workflow)
+        exact = set(self.use_case_index[exact_use_case]) if exact_use_case is not None else set()
+        partial = set()
+        for use_case in partial_use_cases:
+            partial.update(self.use_case_index[use_case])
+        return exact, partial - exact
+
+    def pain_point_matches(self, pain_points):
+        """Return the positions of tools sharing at least one lowercased pain point."""
+        matched = set()
+        for point in pain_points:
+            matched.update(self.pain_point_index.get(point, ()))
+        return matched
+
+
+class CatalogStore:
+    """
+    Holds the current CompiledCatalog and rebuilds it when the catalog changes.
+
+    `version_reader` returns the catalog version stored in the database (bumped
+    by triggers on every ai_tools write, whichever process made it) and
+    `loader` returns the API payloads of the tools (AITool.to_dict()) in
+    database order. The version is polled
+    at most once every `check_interval` seconds; `invalidate()` forces the next
+    `get()` to check again, which is how commits made in this process take
+    effect immediately.
+    """
+
+    def __init__(self, loader=None, version_reader=None, check_interval=1.0):
+        self.loader = loader
+        self.version_reader = version_reader
+        self.check_interval = check_interval
+        self._catalog = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app, loader, version_reader):
+        self.loader = loader
+        self.version_reader = version_reader
+        self.check_interval = app.config.get('CATALOG_CHECK_INTERVAL', self.check_interval)
+        # A snapshot of another application's database must not be served under the same version
+        with self._lock:
+            self._catalog = None
+            self._checked_at = None
+
+    def invalidate(self):
+        self._checked_at = None
+
+    def get(self):
+        checked_at = self._checked_at
+        if self._catalog is not None and checked_at is not None and \
+                time.monotonic() - checked_at < self.check_interval:
+            return self._catalog
+
+        with self._lock:
+            version = self.version_reader()
+            if self._catalog is None or self._catalog.version != version:
+                self._catalog = CompiledCatalog(self.loader(), version)
+            self._checked_at = time.monotonic()
+            return self._catalog
+
+
+def version_trigger_statements(table_names):
+    """CREATE TRIGGER statements that bump catalog_version on writes to `table_names`."""
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS {table_name}_{operation.lower()}_version '
+        f'AFTER {operation} ON {table_name} BEGIN '
+        f'UPDATE catalog_version SET version = version + 1 WHERE id = 1; END'
+        for table_name in table_names
+        for operation in ('INSERT', 'UPDATE', 'DELETE')
+    ]
+
+
+def drop_version_trigger_statements(table_names):
+    return [
+        f'DROP TRIGGER IF EXISTS {table_name}_{operation}_version'
+        for table_name in table_names
+        for operation in ('insert', 'update', 'delete')
+    ]
+
+
+def install_version_triggers(connection, table_names):
+    """
+    Create the catalog_version row and the triggers that bump it.
+
+    Every INSERT, UPDATE or DELETE on the given tables increments the version,
+    so a catalog compiled in one process notices writes made by another
+    (for example `python init_db.py` while the server is running).
+    """
+    connection.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS catalog_version ('
+        'id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)'
+    )
+    connection.exec_driver_sql('INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)')
+    for statement in version_trigger_statements(table_names):
+        connection.exec_driver_sql(statement)
+
+
+def read_catalog_version(connection):
+    return connection.exec_driver_sql('SELECT version FROM catalog_version WHERE id = 1').scalar()
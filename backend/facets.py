@@ -0,0 +1,262 @@
+"""
+Faceted search over a CompiledCatalog.
+
+Every facet value maps to a bitmap of the tools that have it, held in a
+Python int whose bit i stands for the tool at position i. Filters are
+unions within a facet and intersections across facets, and a facet's
+counts are taken over the tools matching the other facets' filters, so
+selecting a category still shows how many tools every other category
+would give.
+
+Text queries use an index of the words of tool names and descriptions:
+words found in many tools keep a bitmap, the rest a sorted tuple of
+positions.
+"""
+import bisect
+import heapq
+import itertools
+import re
+import threading
+from collections import Counter, OrderedDict
+from vectorized import np
+
+# Query argument name -> field of the tool payload; list fields hold several values per tool
+FACETS = {
+    'category': 'category',
+    'pricing_model': 'pricing_model',
+    'skill_level': 'skill_level',
+    'role': 'target_roles',
+    'use_case': 'use_cases',
+    'pain_point': 'pain_points'
+}
+LIST_FIELDS = ('target_roles', 'use_cases', 'pain_points')
+
+# Rough cost of counting one facet, in units of one machine word of a bitmap
+# AND: per matching tool when their values are counted one by one, per
+# (tool, value) pair with NumPy. The cheapest way is picked per query.
+SCAN_COST_WORDS = 200
+NUMPY_COST_WORDS = 2
+# Words found in more than 1 / DENSE_WORD_RATIO of the tools are kept as bitmaps
+DENSE_WORD_RATIO = 64
+# Bitmaps of recently searched query words kept per catalog snapshot
+TERM_CACHE_SIZE = 256
+
+WORD = re.compile(r'\w+')
+
+
+def bitmap(positions, size):
+    """A bitmap with the bits of `positions` set."""
+    bits = bytearray(-(-size // 8))
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+
+if hasattr(int, 'bit_count'):
+    def popcount(bits):
+        """Number of set bits of a bitmap."""
+        return bits.bit_count()
+else:  # int.bit_count is new in Python 3.10
+    def popcount(bits):
+        """Number of set bits of a bitmap."""
+        return bin(bits).count('1')
+
+
+def iter_positions(bits, start=0):
+    """The set bits of a bitmap at or above `start`, in increasing order."""
+    digits = format(bits >> start, 'b')[::-1]
+    position = digits.find('1')
+    while position != -1:
+        yield start + position
+        position = digits.find('1', position + 1)
+
+
+def _values(payload, field):
+    value = payload.get(field)
+    if field in LIST_FIELDS:
+        return value or ()
+    return (value,) if value is not None else ()
+
+
+class FacetIndex:
+    """
+    Facet bitmaps and the word index of a catalog snapshot.
+
+    Values are matched case-insensitively and reported as the first tool
+    spelled them. Built on first use and kept in the catalog's `derived` cache.
+    """
+
+    def __init__(self, catalog):
+        self.size = len(catalog)
+        self.tools = catalog.tools
+        self.ids = [tool.id for tool in catalog.tools]
+        self.all = (1 << self.size) - 1
+        self.words = max(1, -(-self.size // 64))
+
+        self.values = {}  # facet -> {lowercased value: bitmap}
+        self.keys = {}  # facet -> lowercased values, in the order of `values`
+        self.labels = {}  # facet -> {lowercased value: value as spelled in the catalog}
+        self.tool_keys = {}  # facet -> the lowercased values of each tool, by position
+        self.postings = {}  # facet -> number of (tool, value) pairs
+        self.arrays = {}  # facet -> (value codes, tool positions) of every pair, with NumPy
+        for facet, field in FACETS.items():
+            positions = {}
+            labels = {}
+            tool_keys = []
+            for tool in catalog.tools:
+                keys = []
+                for value in _values(tool.payload, field):
+                    key = str(value).strip().lower()
+                    if key not in keys:
+                        keys.append(key)
+                        positions.setdefault(key, []).append(tool.position)
+                    labels.setdefault(key, str(value))
+                tool_keys.append(tuple(keys))
+            self.values[facet] = {key: bitmap(found, self.size) for key, found in positions.items()}
+            self.keys[facet] = list(positions)
+            self.labels[facet] = labels
+            self.tool_keys[facet] = tool_keys
+            self.postings[facet] = sum(len(keys) for keys in tool_keys)
+            if np is not None:
+                codes = {key: code for code, key in enumerate(positions)}
+                self.arrays[facet] = (
+                    np.fromiter((codes[key] for keys in tool_keys for key in keys), dtype=np.int32,
+                                count=self.postings[facet]),
+                    np.repeat(np.arange(self.size, dtype=np.int32), [len(keys) for keys in tool_keys])
+                )
+        # Unfiltered counts never change, so they are counted once
+        self.totals = {
+            facet: {key: popcount(bits) for key, bits in values.items()}
+            for facet, values in self.values.items()
+        }
+
+        word_positions = {}
+        for tool in catalog.tools:
+            text = f"{tool.payload.get('name') or ''} {tool.payload.get('description') or ''}".lower()
+            for word in set(WORD.findall(text)):
+                word_positions.setdefault(word, []).append(tool.position)
+        self.vocabulary = sorted(word_positions)
+        dense = self.size // DENSE_WORD_RATIO
+        self.word_postings = [
+            bitmap(found, self.size) if len(found) > dense else tuple(found)
+            for found in (word_positions[word] for word in self.vocabulary)
+        ]
+        self._term_bits = OrderedDict()
+        self._term_lock = threading.Lock()
+
+    @classmethod
+    def for_catalog(cls, catalog):
+        index = catalog.derived.get('facet_index')
+        if index is None:
+            index = catalog.derived['facet_index'] = cls(catalog)
+        return index
+
+    def match_text(self, query):
+        """Bitmap of the tools whose name or description has a word starting with each word of `query`."""
+        bits = self.all
+        for term in WORD.findall(query.lower()):
+            bits &= self._term(term)
+            if not bits:
+                break
+        return bits
+
+    def _term(self, term):
+        with self._term_lock:
+            bits = self._term_bits.get(term)
+            if bits is not None:
+                self._term_bits.move_to_end(term)
+                return bits
+        start = bisect.bisect_left(self.vocabulary, term)
+        end = bisect.bisect_left(self.vocabulary, term + '\U0010ffff', start)
+        bits = 0
+        sparse = bytearray(-(-self.size // 8))
+        for postings in self.word_postings[start:end]:
+            if isinstance(postings, int):
+                bits |= postings
+            else:
+                for position in postings:
+                    sparse[position >> 3] |= 1 << (position & 7)
+        bits |= int.from_bytes(sparse, 'little')
+        with self._term_lock:
+            self._term_bits[term] = bits
+            while len(self._term_bits) > TERM_CACHE_SIZE:
+                self._term_bits.popitem(last=False)
+        return bits
+
+    def facet_filter(self, facet, values):
+        """Union of the bitmaps of `values` of one facet (unknown values match nothing)."""
+        bits = 0
+        for value in values:
+            bits |= self.values[facet].get(value.strip().lower(), 0)
+        return bits
+
+    def search(self, filters, text=None):
+        """
+        Return (matches, counts) for `filters`, a dict of facet -> values.
+
+        `matches` is the bitmap of the tools passing every filter and the text
+        match. `counts` maps every facet to {lowercased value: count} of the
+        tools that would match with that facet's own filter left out.
+        """
+        text_bits = self.match_text(text) if text and text.strip() else self.all
+        facet_bits = {facet: self.facet_filter(facet, values) for facet, values in filters.items() if values}
+
+        matches = text_bits
+        for bits in facet_bits.values():
+            matches &= bits
+
+        counts = {}
+        for facet in FACETS:
+            base = text_bits
+            for other, bits in facet_bits.items():
+                if other != facet:
+                    base &= bits
+            counts[facet] = self._counts(facet, base)
+        return matches, counts
+
+    def _counts(self, facet, base):
+        if base == self.all:
+            return self.totals[facet]
+        matched = popcount(base)
+        if not matched:
+            return {}
+
+        scan_cost = matched * SCAN_COST_WORDS
+        bitmap_cost = len(self.keys[facet]) * self.words
+        numpy_cost = self.postings[facet] * NUMPY_COST_WORDS if facet in self.arrays else bitmap_cost
+        if scan_cost <= min(bitmap_cost, numpy_cost):
+            # Few matching tools: count their values
+            tool_keys = self.tool_keys[facet]
+            return Counter(itertools.chain.from_iterable(tool_keys[position] for position in iter_positions(base)))
+        if numpy_cost < bitmap_cost:
+            codes, owners = self.arrays[facet]
+            mask = np.unpackbits(
+                np.frombuffer(base.to_bytes(-(-self.size // 8), 'little'), dtype=np.uint8),
+                count=self.size, bitorder='little'
+            ).view(bool)
+            totals = np.bincount(codes[mask[owners]], minlength=len(self.keys[facet]))
+            found = totals.nonzero()[0]
+            keys = self.keys[facet]
+            return {keys[code]: count for code, count in zip(found.tolist(), totals[found].tolist())}
+        counts = {}
+        for key, bits in self.values[facet].items():
+            count = popcount(bits & base)
+            if count:
+                counts[key] = count
+        return counts
+
+    def page(self, matches, after=0, limit=100):
+        """Return (tools, next_after) of the matching tools with ids above `after`, in id order."""
+        start = bisect.bisect_right(self.ids, after)
+        tools = []
+        for position in iter_positions(matches, start):
+            if len(tools) == limit:
+                return tools, tools[-1].id
+            tools.append(self.tools[position])
+        return tools, None
+
+    def top(self, facet, counts, limit):
+        """[{"value", "count"}] of the `limit` largest counts, ties in value order."""
+        labels = self.labels[facet]
+        ranked = heapq.nsmallest(limit, counts.items(), key=lambda item: (-item[1], labels[item[0]]))
+        return [{'value': labels[key], 'count': count} for key, count in ranked if count]
@@ -0,0 +1,67 @@
+import json
+try:
+    import orjson
+except ImportError:  # orjson is optional; responses are then encoded with the json module
+    orjson = None
+
+BACKENDS = ('auto', 'orjson', 'json')
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+_use_orjson = orjson is not None
+
+
+def configure(backend):
+    """Select the encoder: 'orjson', 'json', or 'auto' (orjson when it is installed)."""
+    global _use_orjson
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    if backend == 'orjson' and orjson is None:
+        raise ValueError('JSON_BACKEND is orjson but orjson is not installed')
+    _use_orjson = orjson is not None and backend != 'json'
+
+
+def backend():
+    return 'orjson' if _use_orjson else 'json'
+
+
+def dumps(value):
+    """Encode `value` as compact UTF-8 JSON bytes."""
+    if _use_orjson:
+        return orjson.dumps(value)
+    return _encoder.encode(value).encode('utf-8')
+
+
+def tool_fragment(tool):
+    """
+    The encoded API payload of a CompiledTool.
+
+    Encoded on first use and kept on the tool, so each payload is serialized
+    once per catalog snapshot however many responses include it.
+    """
+    fragment = tool.fragment
+    if fragment is None:
+        fragment = tool.fragment = dumps(tool.payload)
+    return fragment
+
+
+def extend_fragment(fragment, fields):
+    """Add the keys of `fields` to an encoded JSON object, without decoding it."""
+    if not fields:
+        return fragment
+    if fragment == b'{}':
+        return dumps(fields)
+    return fragment[:-1] + b',' + dumps(fields)[1:]
+
+
+def recommendation_json(recommendation):
+    """One /api/recommend entry: the tool's cached fragment spliced with its score and explanation."""
+    return extend_fragment(tool_fragment(recommendation['tool']), {
+        'score': recommendation['score'],
+        'scoring_breakdown': recommendation['scoring_breakdown'],
+        'explanation': recommendation['explanation']
+    })
+
+
+def json_array(items):
+    """Join already encoded JSON values into an array."""
+    return b'[' + b','.join(items) + b']'
@@ -0,0 +1,62 @@
+"""
+gunicorn settings, read from this directory by default:
+
+    gunicorn wsgi:application
+
+The application is loaded and warmed up once in the master (preload_app),
+whose objects are then frozen out of the garbage collector's reach, so the
+forked workers share that memory copy-on-write instead of each building
+their own.
+"""
+import gc
+import os
+import time
+from parallel import default_workers
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', str(default_workers())))
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', '8'))
+backlog = 2048
+preload_app = True
+accesslog = '-'
+
+# Every worker scores very large catalogs with its own pool of PARALLEL_WORKERS
+# processes: unless it is set, split the CPUs between the workers (so with one
+# worker per CPU, the workers score in process)
+os.environ.setdefault('PARALLEL_WORKERS', str(max(1, default_workers() // workers)))
+
+# No collections until the fork: objects built while loading the application stay
+# where they were allocated instead of leaving holes in pages the workers share
+gc.disable()
+
+
+def when_ready(server):
+    import app as app_module
+
+    with server.app.wsgi().app_context():
+        # Pooled connections must not be shared across the fork; workers open their own
+        app_module.db.engine.dispose()
+    gc.freeze()
+    server.log.info('Start-up report: %s', app_module.startup_report.as_dict())
+
+
+def pre_fork(server, worker):
+    worker.forked_at = time.perf_counter()
+
+
+def post_fork(server, worker):
+    gc.enable()
+
+
+def post_worker_init(worker):
+    import app as app_module
+
+    app_module.startup_report.record('fork', time.perf_counter() - worker.forked_at)
+
+
+def worker_exit(server, worker):
+    import app as app_module
+
+    app_module.response_recorder.close()
+    app_module.parallel_scorer.close()
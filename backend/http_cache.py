@@ -0,0 +1,65 @@
+import gzip
+import hashlib
+from flask import current_app, request
+from metrics import span
+import fragments
+
+
+class RenderedBody:
+    """
+    A JSON response body encoded once per catalog version.
+
+    The ETag is a hash of the body rather than of the catalog version, so every
+    worker process hands out the same tag for the same content.
+    """
+    __slots__ = ('body', 'gzipped', 'etag')
+
+    def __init__(self, body, compress_min_size):
+        self.body = body
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.gzipped = gzip.compress(body, compresslevel=6) if len(body) >= compress_min_size else None
+
+
+def rendered_json(catalog, key, build):
+    """
+    Return the RenderedBody cached on `catalog` under `key`, building it on first use.
+
+    `build` returns the value to encode, or the encoded body as bytes.
+    """
+    cache_key = ('http', key)
+    rendered = catalog.derived.get(cache_key)
+    if rendered is None:
+        with span('render'):
+            body = build()
+            if not isinstance(body, bytes):
+                body = fragments.dumps(body)
+            rendered = catalog.derived[cache_key] = RenderedBody(
+                body, current_app.config['CATALOG_CACHE_GZIP_MIN_SIZE']
+            )
+    return rendered
+
+
+def catalog_response(catalog, key, build):
+    """
+    Serve a catalog read endpoint from its pre-rendered body.
+
+    Answers If-None-Match with 304 and sends the gzipped copy to clients that
+    accept it (with its own ETag, as the two representations differ).
+    """
+    rendered = rendered_json(catalog, key, build)
+    use_gzip = rendered.gzipped is not None and 'gzip' in request.accept_encodings
+    etag = rendered.etag + '-gzip' if use_gzip else rendered.etag
+
+    if request.if_none_match.contains(rendered.etag) or request.if_none_match.contains(rendered.etag + '-gzip'):
+        response = current_app.response_class(status=304)
+    elif use_gzip:
+        response = current_app.response_class(rendered.gzipped, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = current_app.response_class(rendered.body, mimetype='application/json')
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f"public, max-age={current_app.config['CATALOG_CACHE_MAX_AGE']}"
+    response.headers['X-Catalog-Version'] = str(catalog.version)
+    response.vary.add('Accept-Encoding')
+    return response
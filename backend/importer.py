@@ -0,0 +1,258 @@
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from catalog import drop_version_trigger_statements, version_trigger_statements
+from models import AITool, CATALOG_TABLES, TAG_FIELDS, TagWriter
+
+SKILL_LEVELS = ('beginner', 'intermediate', 'advanced', 'all')
+TEXT_FIELDS = ['name', 'description', 'category', 'skill_level', 'pricing_model', 'official_url']
+UPSERT_KEYS = {'name': 'name', 'url': 'official_url'}
+MAX_LENGTHS = {field: AITool.__table__.c[field].type.length for field in TEXT_FIELDS}
+
+
+def read_records(path):
+    """
+    Stream raw records from a JSON Lines or CSV file, one at a time.
+
+    Yields (line_number, record, error). In CSV files the tag columns hold
+    either a JSON array or values separated by "|".
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline='', encoding='utf-8') as handle:
+        if extension == '.csv':
+            reader = csv.DictReader(handle)
+            for record in reader:
+                for field in TAG_FIELDS:
+                    value = (record.get(field) or '').strip()
+                    if value.startswith('['):
+                        try:
+                            record[field] = json.loads(value)
+                        except ValueError:
+                            pass  # reported by validate_record
+                    else:
+                        record[field] = [item.strip() for item in value.split('|') if item.strip()]
+                yield reader.line_num, record, None
+        elif extension in ('.jsonl', '.ndjson'):
+            for line_number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line), None
+                except ValueError as error:
+                    yield line_number, None, f'Invalid JSON: {error}'
+        else:
+            raise ValueError(f'Unsupported file type {extension!r}, expected .jsonl, .ndjson or .csv')
+
+
+def validate_record(record):
+    """Return (row, None) for a valid record or (None, error message)."""
+    if not isinstance(record, dict):
+        return None, 'Record must be an object'
+
+    row = {}
+    for field in TEXT_FIELDS:
+        value = record.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return None, f'Missing required field: {field}'
+        length = MAX_LENGTHS[field]
+        if length and len(value) > length:
+            return None, f'{field} is longer than {length} characters'
+        row[field] = value.strip()
+    if row['skill_level'] not in SKILL_LEVELS:
+        return None, f"skill_level must be one of {', '.join(SKILL_LEVELS)}"
+
+    rating = record.get('rating')
+    try:
+        row['rating'] = float(rating) if rating not in (None, '') else 0.0
+    except (TypeError, ValueError):
+        return None, 'rating must be a number'
+    if not 0.0 <= row['rating'] <= 5.0:
+        return None, 'rating must be between 0 and 5'
+
+    tags = {}
+    for field in TAG_FIELDS:
+        value = record.get(field, [])
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            return None, f'{field} must be a list of strings'
+        tags[field] = value
+    row['tags'] = tags
+    return row, None
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.rejected = 0
+        self.started_at = time.monotonic()
+
+    @property
+    def processed(self):
+        return self.inserted + self.updated + self.rejected
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    @property
+    def rows_per_second(self):
+        return (self.inserted + self.updated) / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return (
+            f'{self.inserted} inserted, {self.updated} updated, {self.rejected} rejected '
+            f'in {self.elapsed:.1f}s ({self.rows_per_second:,.0f} rows/s)'
+        )
+
+
+class CatalogImporter:
+    """
+    Bulk upsert of tools through a raw sqlite3 connection.
+
+    Rows are written in batches with executemany: new tools get ids assigned
+    here (so their tags can be written without reading ids back), existing
+    tools, matched by name or official URL, are updated and their tags
+    replaced. Every `commit_every` rows the transaction is committed, which
+    keeps the WAL bounded on very large files.
+
+    Inside each transaction the catalog version triggers are dropped and the
+    version is bumped once before commit instead of once per written row;
+    BEGIN IMMEDIATE keeps other writers out while the triggers are gone.
+    Foreign key checks are off for the import, as every id written comes
+    from this importer or the tag tables.
+    """
+
+    def __init__(self, connection, key='name', batch_size=1000, commit_every=50000,
+                 synchronous='OFF', progress=None, rejects=None):
+        if key not in UPSERT_KEYS:
+            raise ValueError(f"key must be one of {', '.join(UPSERT_KEYS)}")
+        self.connection = connection
+        self.key_column = UPSERT_KEYS[key]
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.synchronous = synchronous
+        self.progress = progress
+        self.rejects = rejects
+        self.report = ImportReport()
+
+    def _begin(self, cursor):
+        cursor.execute('BEGIN IMMEDIATE')
+        for statement in drop_version_trigger_statements(CATALOG_TABLES):
+            cursor.execute(statement)
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM ai_tools')
+        self._next_id = cursor.fetchone()[0] + 1
+
+    def _commit(self, cursor):
+        cursor.execute('UPDATE catalog_version SET version = version + 1 WHERE id = 1')
+        for statement in version_trigger_statements(CATALOG_TABLES):
+            cursor.execute(statement)
+        cursor.execute('COMMIT')
+
+    def run(self, sources):
+        """Import every (source, line_number, record, error) from `sources`."""
+        connection = self.connection
+        isolation_level = connection.isolation_level
+        connection.isolation_level = None  # transactions are managed explicitly below
+        cursor = connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=OFF')
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute(f'PRAGMA synchronous={self.synchronous}')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute('PRAGMA cache_size=-65536')  # 64 MB
+
+        cursor.execute(f'SELECT {self.key_column}, id FROM ai_tools')
+        self._existing = dict(cursor.fetchall())
+        self._tags = TagWriter(cursor)
+
+        try:
+            self._begin(cursor)
+            since_commit = 0
+            batch = []
+            for source, line_number, record, error in sources:
+                row = None
+                if error is None:
+                    row, error = validate_record(record)
+                if error is not None:
+                    self._reject(source, line_number, record, error)
+                    continue
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._write(cursor, batch)
+                    since_commit += len(batch)
+                    batch = []
+                    if since_commit >= self.commit_every:
+                        self._commit(cursor)
+                        self._begin(cursor)
+                        since_commit = 0
+            if batch:
+                self._write(cursor, batch)
+            self._commit(cursor)
+        except BaseException:
+            if connection.in_transaction:
+                cursor.execute('ROLLBACK')
+            raise
+        finally:
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute('PRAGMA foreign_keys=ON')
+            connection.isolation_level = isolation_level
+        return self.report
+
+    def _reject(self, source, line_number, record, error):
+        self.report.rejected += 1
+        if self.rejects is not None:
+            self.rejects.write(json.dumps({'source': source, 'line': line_number, 'error': error, 'record': record}) + '\n')
+
+    def _write(self, cursor, batch):
+        inserts = []
+        updates = []
+        tags = {}
+        for row in batch:
+            tool_id = self._existing.get(row[self.key_column])
+            if tool_id is None:
+                tool_id = self._next_id
+                self._next_id += 1
+                self._existing[row[self.key_column]] = tool_id
+                inserts.append(row)
+            else:
+                updates.append(row)
+            row['id'] = tool_id
+            # A later row for the same tool wins
+            tags[tool_id] = row['tags']
+
+        columns = ['id'] + TEXT_FIELDS + ['rating']
+        if inserts:
+            # Same text format SQLAlchemy uses for DateTime columns on SQLite
+            created_at = datetime.utcnow().isoformat(sep=' ', timespec='microseconds')
+            cursor.executemany(
+                f"INSERT INTO ai_tools ({', '.join(columns)}, created_at) "
+                f"VALUES ({', '.join('?' * len(columns))}, ?)",
+                [tuple(row[column] for column in columns) + (created_at,) for row in inserts]
+            )
+        if updates:
+            assignments = ', '.join(f'{column} = ?' for column in columns[1:])
+            cursor.executemany(
+                f'UPDATE ai_tools SET {assignments} WHERE id = ?',
+                [tuple(row[column] for column in columns[1:]) + (row['id'],) for row in updates]
+            )
+        self._tags.replace(tags, new_tool_ids={row['id'] for row in inserts})
+
+        self.report.inserted += len(inserts)
+        self.report.updated += len(updates)
+        if self.progress is not None:
+            self.progress(self.report)
+
+
+def print_progress(report):
+    sys.stderr.write(
+        f'\r{report.processed:,} rows ({report.rows_per_second:,.0f} rows/s, {report.rejected:,} rejected)'
+    )
+    sys.stderr.flush()
+
+
+def iter_sources(paths):
+    for path in paths:
+        for line_number, record, error in read_records(path):
+            yield path, line_number, record, error
@@ -1,5 +1,7 @@
 from app import app, db, AITool
-import json
+from importer import CatalogImporter, iter_sources, print_progress
+import argparse
+import sys
 
 def init_database():
     with app.app_context():
@@ -151,13 +153,13 @@ def init_database():
                 name=tool_data['name'],
                 description=tool_data['description'],
                 category=tool_data['category'],
-                target_roles=json.dumps(tool_data['target_roles']),
+                target_roles=tool_data['target_roles'],
                 skill_level=tool_data['skill_level'],
-                use_cases=json.dumps(tool_data['use_cases']),
-                pain_points=json.dumps(tool_data['pain_points']),
+                use_cases=tool_data['use_cases'],
+                pain_points=tool_data['pain_points'],
                 pricing_model=tool_data['pricing_model'],
                 official_url=tool_data['official_url'],
-                features=json.dumps(tool_data['features']),
+                features=tool_data['features'],
                 rating=tool_data['rating']
             )
             db.session.add(tool)
@@ -165,5 +167,42 @@ def init_database():
         db.session.commit()
         print(f"Database initialized with {len(tools_data)} AI tools.")
 
+def import_catalog(paths, key='name', batch_size=1000, synchronous='OFF', rejects_path=None):
+    """
+    Stream tools from JSON Lines / CSV files into the database.
+
+    Tools are upserted by name (or official URL with key='url'). Rejected rows
+    are counted and, with rejects_path, written there as JSON Lines together
+    with the reason they were rejected.
+    """
+    with app.app_context():
+        # Importing app has already created / migrated the schema
+        raw_connection = db.engine.raw_connection()
+        rejects = open(rejects_path, 'w', encoding='utf-8') if rejects_path else None
+        try:
+            importer = CatalogImporter(
+                raw_connection.driver_connection, key=key, batch_size=batch_size,
+                synchronous=synchronous, progress=print_progress, rejects=rejects
+            )
+            report = importer.run(iter_sources(paths))
+        finally:
+            raw_connection.close()
+            if rejects is not None:
+                rejects.close()
+        sys.stderr.write('\n')
+        print(f'Imported catalog: {report.summary()}')
+        return report
+
 if __name__ == '__main__':
-    init_database()
+    parser = argparse.ArgumentParser(description='Seed the database, or bulk import tools from files.')
+    parser.add_argument('files', nargs='*', help='.jsonl / .ndjson / .csv files to import; without files the sample tools are loaded')
+    parser.add_argument('--key', choices=['name', 'url'], default='name', help='column identifying existing tools to update')
+    parser.add_argument('--batch-size', type=int, default=1000, help='rows per executemany batch')
+    parser.add_argument('--synchronous', choices=['OFF', 'NORMAL', 'FULL'], default='OFF', help='SQLite synchronous mode during the import')
+    parser.add_argument('--rejects', help='write rejected rows to this JSON Lines file')
+    args = parser.parse_args()
+
+    if args.files:
+        import_catalog(args.files, args.key, args.batch_size, args.synchronous, args.rejects)
+    else:
+        init_database()
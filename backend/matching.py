@@ -0,0 +1,72 @@
+class UseCaseMatcher:
+    """
+    Substring index over the distinct (lowercased) use cases of a catalog.
+
+    A workflow "partially matches" a use case when either string contains the
+    other. Both directions are answered without comparing the workflow to
+    every use case:
+
+    - use cases contained in the workflow: every substring of the workflow
+      whose length is one of the use case lengths is looked up in a hash
+      index, so the cost depends on the workflow, not on the catalog
+    - use cases containing the workflow: the postings of the workflow's
+      trigrams are intersected and the few survivors verified with `in`;
+      workflows shorter than a trigram fall back to a scan
+    """
+
+    GRAM = 3
+
+    def __init__(self, use_cases):
+        self.use_cases = list(use_cases)
+        self._known = set(self.use_cases)
+        self._lengths = sorted({len(use_case) for use_case in self.use_cases})
+
+        grams = {}
+        for index, use_case in enumerate(self.use_cases):
+            for gram in {use_case[start:start + self.GRAM] for start in range(len(use_case) - self.GRAM + 1)}:
+                grams.setdefault(gram, []).append(index)
+        self._grams = grams
+
+    def contained_in(self, workflow):
+        """Use cases that are substrings of `workflow` (including equal to it)."""
+        found = set()
+        for length in self._lengths:
+            if length > len(workflow):
+                break
+            for start in range(len(workflow) - length + 1):
+                piece = workflow[start:start + length]
+                if piece in self._known:
+                    found.add(piece)
+        return found
+
+    def containing(self, workflow):
+        """Use cases that have `workflow` as a substring (including equal to it)."""
+        if len(workflow) < self.GRAM:
+            return {use_case for use_case in self.use_cases if workflow in use_case}
+
+        postings = []
+        for gram in {workflow[start:start + self.GRAM] for start in range(len(workflow) - self.GRAM + 1)}:
+            indexes = self._grams.get(gram)
+            if indexes is None:
+                return set()
+            postings.append(indexes)
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+        for indexes in postings[1:]:
+            candidates.intersection_update(indexes)
+            if not candidates:
+                return set()
+        return {self.use_cases[index] for index in candidates if workflow in self.use_cases[index]}
+
+    def match(self, workflow):
+        """
+        Return (exact, partial) for a lowercased workflow.
+
+        `exact` is the workflow when it is itself a use case, else None;
+        `partial` lists the other use cases that contain or are contained in it.
+        """
+        matches = self.contained_in(workflow) | self.containing(workflow)
+        exact = workflow if workflow in self._known else None
+        matches.discard(workflow)
+        return exact, list(matches)
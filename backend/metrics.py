@@ -0,0 +1,233 @@
+import bisect
+import cProfile
+import hmac
+import io
+import logging
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from flask import g, has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@contextmanager
+def span(name):
+    """
+    Time a phase of the current request.
+
+    Durations of spans with the same name are added up (a batch request scores
+    many profiles). Outside a request, or with metrics disabled, this only
+    runs the block.
+    """
+    spans = g.get('_timing_spans') if has_request_context() else None
+    if spans is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans[name] = spans.get(name, 0.0) + time.perf_counter() - started
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+class Metrics:
+    """
+    Per-process request metrics.
+
+    Every request gets a `Server-Timing` header with its span() durations and
+    total time, and is counted in latency histograms per endpoint and per
+    endpoint and phase, rendered in the Prometheus text format by render().
+    Streamed responses are timed up to the point the view returns.
+
+    A sample of requests (`profile_sample_rate`, 0 to 1) can be run under
+    cProfile; the profiles of those slower than `profile_slow_ms` are kept
+    (the last `profile_keep`) for profiles(). One request is profiled at a
+    time.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, profile_sample_rate=0.0, profile_slow_ms=500.0, profile_keep=20):
+        self.buckets = tuple(buckets)
+        self.enabled = True
+        self.profile_sample_rate = profile_sample_rate
+        self.profile_slow_ms = profile_slow_ms
+        self._profiles = deque(maxlen=profile_keep)
+        self._profile_lock = threading.Lock()
+        self._requests = {}
+        self._phases = {}
+        self._statuses = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', self.enabled)
+        self.configure_profiling(
+            app.config.get('PROFILE_SAMPLE_RATE', self.profile_sample_rate),
+            app.config.get('PROFILE_SLOW_MS', self.profile_slow_ms)
+        )
+        if self.enabled:
+            app.before_request(self._before_request)
+            app.after_request(self._after_request)
+            app.teardown_request(self._teardown_request)
+
+    def configure_profiling(self, sample_rate, slow_ms):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError('sample_rate must be between 0 and 1')
+        if slow_ms < 0:
+            raise ValueError('slow_ms must not be negative')
+        self.profile_sample_rate = sample_rate
+        self.profile_slow_ms = slow_ms
+
+    def add_collector(self, collect):
+        """
+        Register a function rendered with the metrics.
+
+        It returns (name, type, help, [(labels dict, value), ...]) tuples, read
+        at scrape time (for counters kept elsewhere, such as cache stats).
+        """
+        self._collectors.append(collect)
+
+    def _before_request(self):
+        g._timing_started = time.perf_counter()
+        g._timing_spans = {}
+        if self.profile_sample_rate and random.random() < self.profile_sample_rate \
+                and self._profile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            g._profiler = profiler
+            profiler.enable()
+
+    def _after_request(self, response):
+        started = g.pop('_timing_started', None)
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        spans = g.pop('_timing_spans', {})
+        profiler = g.pop('_profiler', None)
+        if profiler is not None:
+            self._finish_profile(profiler, total)
+
+        response.headers['Server-Timing'] = ', '.join(
+            [f'{name};dur={duration * 1000:.2f}' for name, duration in spans.items()] + [f'total;dur={total * 1000:.2f}']
+        )
+
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        with self._lock:
+            key = (endpoint, request.method)
+            histogram = self._requests.get(key)
+            if histogram is None:
+                histogram = self._requests[key] = Histogram(self.buckets)
+            histogram.observe(total)
+            status_key = (endpoint, request.method, response.status_code)
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+            for name, duration in spans.items():
+                phase = self._phases.get((endpoint, name))
+                if phase is None:
+                    phase = self._phases[(endpoint, name)] = Histogram(self.buckets)
+                phase.observe(duration)
+        return response
+
+    def _teardown_request(self, error=None):
+        # after_request is skipped when the response could not be built
+        profiler = g.pop('_profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            self._profile_lock.release()
+
+    def _finish_profile(self, profiler, total):
+        profiler.disable()
+        try:
+            if total * 1000 >= self.profile_slow_ms:
+                output = io.StringIO()
+                pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(30)
+                self._profiles.append({
+                    'method': request.method,
+                    'path': request.full_path.rstrip('?'),
+                    'duration_ms': round(total * 1000, 2),
+                    'recorded_at': datetime.utcnow().isoformat(),
+                    'stats': output.getvalue()
+                })
+                logger.info('Profiled slow request %s %s (%.1f ms)', request.method, request.path, total * 1000)
+        finally:
+            self._profile_lock.release()
+
+    def profiles(self):
+        return list(self._profiles)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            requests = {key: (list(h.counts), h.sum, h.count) for key, h in self._requests.items()}
+            phases = {key: (list(h.counts), h.sum, h.count) for key, h in self._phases.items()}
+            statuses = dict(self._statuses)
+
+        lines += ['# HELP http_requests_total Requests handled, by endpoint, method and status.',
+                  '# TYPE http_requests_total counter']
+        for (endpoint, method, status), count in sorted(statuses.items()):
+            lines.append(f'http_requests_total{{{_labels(endpoint=endpoint, method=method, status=status)}}} {count}')
+
+        lines += ['# HELP http_request_duration_seconds Time spent handling requests.',
+                  '# TYPE http_request_duration_seconds histogram']
+        for (endpoint, method), histogram in sorted(requests.items()):
+            lines += self._render_histogram('http_request_duration_seconds', histogram,
+                                            endpoint=endpoint, method=method)
+
+        lines += ['# HELP http_request_phase_duration_seconds Time spent in each phase of a request.',
+                  '# TYPE http_request_phase_duration_seconds histogram']
+        for (endpoint, phase), histogram in sorted(phases.items()):
+            lines += self._render_histogram('http_request_phase_duration_seconds', histogram,
+                                            endpoint=endpoint, phase=phase)
+
+        for collect in self._collectors:
+            for name, metric_type, help_text, samples in collect():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}']
+                for labels, value in samples:
+                    lines.append(f'{name}{{{_labels(**labels)}}} {value}' if labels else f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def _render_histogram(self, name, histogram, **labels):
+        counts, total, count = histogram
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{_labels(**labels, le=bound)}}} {cumulative}')
+        lines.append(f'{name}_sum{{{_labels(**labels)}}} {total}')
+        lines.append(f'{name}_count{{{_labels(**labels)}}} {count}')
+        return lines
+
+
+def check_token(expected):
+    """True when profiling control is enabled (`expected` set) and the request carries that token."""
+    supplied = request.headers.get('X-Profiling-Token', '')
+    return bool(expected) and hmac.compare_digest(supplied.encode(), expected.encode())
@@ -0,0 +1,67 @@
+import json
+from sqlalchemy.schema import CreateIndex, CreateTable
+from catalog import drop_version_trigger_statements
+from models import db, AITool, TAG_FIELDS, TagWriter
+
+def _catalog_tables():
+    names = {AITool.__tablename__}
+    for tag_table, association_table, _ in TAG_FIELDS.values():
+        names.update((tag_table, association_table))
+    return [table for table in db.metadata.sorted_tables if table.name in names]
+
+def migrate_json_columns(engine):
+    """
+    Convert an ai_tools table with JSON-in-TEXT tag columns to the tag tables.
+
+    Runs in a single transaction, DDL included: the JSON arrays are copied into
+    the tag and association tables (keeping their order) and ai_tools is
+    rebuilt without the old columns, with its new indexes. Returns False when
+    there is nothing to migrate.
+    """
+    raw_connection = engine.raw_connection()
+    try:
+        connection = raw_connection.driver_connection
+        cursor = connection.cursor()
+        cursor.execute('PRAGMA table_info(ai_tools)')
+        columns = [row[1] for row in cursor.fetchall()]
+        if not set(TAG_FIELDS) <= set(columns):
+            return False
+
+        isolation_level = connection.isolation_level
+        connection.isolation_level = None  # pysqlite would otherwise commit before every DDL statement
+        cursor.execute('PRAGMA foreign_keys=OFF')
+        # Keep foreign keys of already created association tables pointing at "ai_tools"
+        cursor.execute('PRAGMA legacy_alter_table=ON')
+        cursor.execute('BEGIN')
+        try:
+            cursor.execute(f"SELECT id, {', '.join(TAG_FIELDS)} FROM ai_tools")
+            legacy_tags = {
+                row[0]: {field: json.loads(value or '[]') for field, value in zip(TAG_FIELDS, row[1:])}
+                for row in cursor.fetchall()
+            }
+
+            for statement in drop_version_trigger_statements(['ai_tools']):
+                cursor.execute(statement)
+            cursor.execute('ALTER TABLE ai_tools RENAME TO ai_tools_legacy')
+
+            for table in _catalog_tables():
+                cursor.execute(str(CreateTable(table, if_not_exists=True).compile(dialect=engine.dialect)))
+                for index in table.indexes:
+                    cursor.execute(str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect)))
+
+            kept = ', '.join(column.name for column in AITool.__table__.columns)
+            cursor.execute(f'INSERT INTO ai_tools ({kept}) SELECT {kept} FROM ai_tools_legacy')
+            cursor.execute('DROP TABLE ai_tools_legacy')
+
+            TagWriter(cursor).replace(legacy_tags)
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        finally:
+            cursor.execute('PRAGMA legacy_alter_table=OFF')
+            cursor.execute('PRAGMA foreign_keys=ON')
+            connection.isolation_level = isolation_level
+        return True
+    finally:
+        raw_connection.close()
@@ -0,0 +1,287 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_dirty
+from datetime import datetime
+import sqlite3
+
+db = SQLAlchemy()
+
+# Tag fields of the API representation of a tool ->
+# (tag table, association table, association column pointing at the tag)
+TAG_FIELDS = {
+    'target_roles': ('roles', 'tool_roles', 'role_id'),
+    'use_cases': ('use_cases', 'tool_use_cases', 'use_case_id'),
+    'pain_points': ('pain_points', 'tool_pain_points', 'pain_point_id'),
+    'features': ('features', 'tool_features', 'feature_id'),
+}
+
+# Every table whose rows are part of the catalog (see catalog.install_version_triggers)
+CATALOG_TABLES = ['ai_tools'] + [table for tables in TAG_FIELDS.values() for table in tables[:2]]
+
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # Association rows are removed by ON DELETE CASCADE when a tool is deleted
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+def configure_sqlite(engine, journal_mode='WAL', synchronous='NORMAL'):
+    """
+    Put a SQLite database in `journal_mode` and set `synchronous` on every connection of `engine`.
+
+    In WAL mode readers do not block the writer nor the writer readers, so
+    worker processes can serve reads while responses are being recorded;
+    synchronous=NORMAL is durable across application crashes in that mode.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_synchronous(dbapi_connection, connection_record):
+        dbapi_connection.execute(f'PRAGMA synchronous={synchronous}')
+
+    # The journal mode is stored in the database file; an in-memory database keeps 'memory'
+    with engine.connect() as connection:
+        connection.exec_driver_sql(f'PRAGMA journal_mode={journal_mode}')
+
+def _association_table(name, tag_table, tag_column):
+    return db.Table(
+        name,
+        db.Column('tool_id', db.Integer, db.ForeignKey('ai_tools.id', ondelete='CASCADE'), primary_key=True),
+        db.Column(tag_column, db.Integer, db.ForeignKey(f'{tag_table}.id', ondelete='CASCADE'), primary_key=True),
+        db.Column('position', db.Integer, nullable=False),  # keeps the tag order of the tool
+        db.Index(f'ix_{name}_{tag_column}', tag_column, 'tool_id')
+    )
+
+tool_roles = _association_table('tool_roles', 'roles', 'role_id')
+tool_use_cases = _association_table('tool_use_cases', 'use_cases', 'use_case_id')
+tool_pain_points = _association_table('tool_pain_points', 'pain_points', 'pain_point_id')
+tool_features = _association_table('tool_features', 'features', 'feature_id')
+
+# Tags
+class Role(db.Model):
+    __tablename__ = 'roles'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False, unique=True)
+
+class UseCase(db.Model):
+    __tablename__ = 'use_cases'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False, unique=True)
+
+class PainPoint(db.Model):
+    __tablename__ = 'pain_points'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False, unique=True)
+
+class Feature(db.Model):
+    __tablename__ = 'features'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False, unique=True)
+
+def _tag_property(field, relationship_name):
+    """
+    List-of-names view over a tag relationship.
+
+    Assigned lists are written to the association table when the tool is
+    flushed, so `AITool(target_roles=[...])` keeps working like it did with
+    the JSON columns.
+    """
+    def getter(self):
+        pending = getattr(self, '_pending_tags', None)
+        if pending is not None and field in pending:
+            return list(pending[field])
+        return [tag.name for tag in getattr(self, relationship_name)]
+
+    def setter(self, names):
+        if getattr(self, '_pending_tags', None) is None:
+            self._pending_tags = {}
+        self._pending_tags[field] = list(names)
+        flag_dirty(self)
+
+    return property(getter, setter)
+
+# Models
+class AITool(db.Model):
+    __tablename__ = 'ai_tools'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    category = db.Column(db.String(50), nullable=False, index=True)
+    skill_level = db.Column(db.String(20), nullable=False, index=True)  # beginner, intermediate, advanced
+    pricing_model = db.Column(db.String(50), nullable=False, index=True)
+    official_url = db.Column(db.String(200), nullable=False)
+    rating = db.Column(db.Float, default=0.0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    role_tags = db.relationship(Role, secondary=tool_roles, order_by=tool_roles.c.position, viewonly=True)
+    use_case_tags = db.relationship(UseCase, secondary=tool_use_cases, order_by=tool_use_cases.c.position, viewonly=True)
+    pain_point_tags = db.relationship(PainPoint, secondary=tool_pain_points, order_by=tool_pain_points.c.position, viewonly=True)
+    feature_tags = db.relationship(Feature, secondary=tool_features, order_by=tool_features.c.position, viewonly=True)
+
+    target_roles = _tag_property('target_roles', 'role_tags')
+    use_cases = _tag_property('use_cases', 'use_case_tags')
+    pain_points = _tag_property('pain_points', 'pain_point_tags')
+    features = _tag_property('features', 'feature_tags')
+
+    def to_dict(self, tags=None):
+        """
+        API representation of the tool.
+
+        `tags` maps each TAG_FIELDS field to this tool's tag names; pass it when
+        the tags were loaded in bulk with load_tags() to avoid per-tool queries.
+        """
+        if tags is None:
+            tags = {field: getattr(self, field) for field in TAG_FIELDS}
+        return {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+            'category': self.category,
+            'target_roles': tags['target_roles'],
+            'skill_level': self.skill_level,
+            'use_cases': tags['use_cases'],
+            'pain_points': tags['pain_points'],
+            'pricing_model': self.pricing_model,
+            'official_url': self.official_url,
+            'features': tags['features'],
+            'rating': self.rating
+        }
+
+class UserResponse(db.Model):
+    __tablename__ = 'user_responses'
+
+    id = db.Column(db.Integer, primary_key=True)
+    role = db.Column(db.String(50), nullable=False)
+    workflow = db.Column(db.String(100), nullable=False)
+    skill_level = db.Column(db.String(20), nullable=False)
+    pain_points = db.Column(db.Text, nullable=False)  # JSON array
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class TagWriter:
+    """
+    Writes tool tags through a DB-API cursor.
+
+    Tag ids are cached by name, so a long-lived writer (the bulk importer, the
+    migration) only looks up or inserts each distinct tag once.
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self._ids = {field: {} for field in TAG_FIELDS}
+
+    def tag_ids(self, field, names):
+        tag_table = TAG_FIELDS[field][0]
+        ids = self._ids[field]
+        missing = [name for name in dict.fromkeys(names) if name not in ids]
+        if missing:
+            self.cursor.executemany(
+                f'INSERT OR IGNORE INTO {tag_table} (name) VALUES (?)', [(name,) for name in missing]
+            )
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                self.cursor.execute(f'SELECT name, id FROM {tag_table} WHERE name IN ({placeholders})', chunk)
+                ids.update(self.cursor.fetchall())
+        return [ids[name] for name in names]
+
+    def replace(self, tools, new_tool_ids=()):
+        """
+        Replace the tags of several tools.
+
+        `tools` maps tool ids to {field: [names]}; fields that are left out keep
+        their current tags. Duplicate names keep their first position. Tools in
+        `new_tool_ids` were just inserted, so there are no old tags to delete.
+        """
+        for field, (_, association_table, tag_column) in TAG_FIELDS.items():
+            updates = {tool_id: tags[field] for tool_id, tags in tools.items() if field in tags}
+            if not updates:
+                continue
+            self.cursor.executemany(
+                f'DELETE FROM {association_table} WHERE tool_id = ?',
+                [(tool_id,) for tool_id in updates if tool_id not in new_tool_ids]
+            )
+            rows = []
+            for tool_id, names in updates.items():
+                names = list(dict.fromkeys(names))
+                rows.extend(
+                    (tool_id, tag_id, position)
+                    for position, tag_id in enumerate(self.tag_ids(field, names))
+                )
+            self.cursor.executemany(
+                f'INSERT INTO {association_table} (tool_id, {tag_column}, position) VALUES (?, ?, ?)', rows
+            )
+
+@event.listens_for(Session, 'after_flush')
+def _write_pending_tags(session, flush_context):
+    tools = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, AITool) and getattr(obj, '_pending_tags', None)
+    ]
+    if tools:
+        cursor = session.connection().connection.cursor()
+        try:
+            TagWriter(cursor).replace({tool.id: tool._pending_tags for tool in tools})
+        finally:
+            cursor.close()
+        session.info['tagged_tools'] = tools
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _clear_pending_tags(session, flush_context):
+    # From here on the tags are read back from the association tables
+    for tool in session.info.pop('tagged_tools', ()):
+        tool._pending_tags = None
+        session.expire(tool, ['role_tags', 'use_case_tags', 'pain_point_tags', 'feature_tags'])
+
+def load_tags(tool_ids=None, fields=TAG_FIELDS):
+    """
+    Load tag names for many tools with one indexed query per tag table.
+
+    Returns {tool_id: {field: [names]}} with every field of `fields` (all
+    TAG_FIELDS by default) present. Without `tool_ids` the tags of the whole
+    catalog are loaded.
+    """
+    tags = {}
+    if tool_ids is not None:
+        tool_ids = list(tool_ids)
+        for tool_id in tool_ids:
+            tags[tool_id] = {field: [] for field in fields}
+    for field in fields:
+        tag_table, association_table, tag_column = TAG_FIELDS[field]
+        sql = (
+            f'SELECT a.tool_id, t.name FROM {association_table} a '
+            f'JOIN {tag_table} t ON t.id = a.{tag_column}'
+        )
+        if tool_ids is None:
+            chunks = [None]
+        else:
+            chunks = [tool_ids[start:start + 500] for start in range(0, len(tool_ids), 500)]
+        for chunk in chunks:
+            if chunk is None:
+                rows = db.session.execute(text(sql + ' ORDER BY a.tool_id, a.position'))
+            elif chunk:
+                rows = db.session.execute(
+                    text(sql + ' WHERE a.tool_id IN :ids ORDER BY a.tool_id, a.position')
+                    .bindparams(bindparam('ids', expanding=True)),
+                    {'ids': chunk}
+                )
+            else:
+                continue
+            for tool_id, name in rows:
+                if tool_id not in tags:
+                    tags[tool_id] = {tag_field: [] for tag_field in fields}
+                tags[tool_id][field].append(name)
+    return tags
+
+def load_tool_payloads(tools):
+    """Serialize AITool rows with their tags loaded in bulk."""
+    tags = load_tags([tool.id for tool in tools]) if len(tools) <= 500 else load_tags()
+    return [tool.to_dict(tags.get(tool.id) or {field: [] for field in TAG_FIELDS}) for tool in tools]
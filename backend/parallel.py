@@ -0,0 +1,268 @@
+"""
+Sharded scoring of very large catalogs in a pool of worker processes.
+
+The parent copies the scoring columns of a CompiledCatalog (skill codes and
+the use case / pain point postings, see vectorized.CatalogArrays) into one
+shared memory block, cut into contiguous shards of tool positions. Workers
+map that block once and score their shard in place, so a request only sends
+a few tag ids to each worker and gets back that shard's top `limit`
+positions; the parent merges those lists.
+"""
+import atexit
+import heapq
+import itertools
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+import vectorized
+from vectorized import CatalogArrays, np
+
+logger = logging.getLogger(__name__)
+
+
+def default_workers():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS and Windows
+        return os.cpu_count() or 1
+
+
+class CSRPostings:
+    """Postings of one shard in compressed sparse row form, indexed by tag id."""
+    __slots__ = ('indptr', 'indices')
+
+    def __init__(self, indptr, indices):
+        self.indptr = indptr
+        self.indices = indices
+
+    def __contains__(self, tag_id):
+        return 0 <= tag_id < len(self.indptr) - 1
+
+    def __getitem__(self, tag_id):
+        return self.indices[self.indptr[tag_id]:self.indptr[tag_id + 1]]
+
+
+class ShardArrays(CatalogArrays):
+    """
+    CatalogArrays of one shard, viewing (not copying) a shared buffer.
+
+    Positions are local to the shard and tags are integer ids, so
+    total_scores() and top_positions() run unchanged.
+    """
+
+    def __init__(self, buffer, layout, skill_levels):
+        views = {
+            name: np.ndarray((length,), dtype=dtype, buffer=buffer, offset=offset)
+            for name, (dtype, offset, length) in layout.items()
+        }
+        self.size = len(views['skill_codes'])
+        self.skill_levels = skill_levels
+        self.skill_codes = views['skill_codes']
+        self.use_case_postings = CSRPostings(views['use_case_indptr'], views['use_case_indices'])
+        self.pain_point_postings = CSRPostings(views['pain_point_indptr'], views['pain_point_indices'])
+
+
+class SharedCatalog:
+    """
+    The scoring columns of a catalog in shared memory, split into `shards`.
+
+    Lives in the catalog's `derived` cache; the block is unlinked when the
+    snapshot is dropped (workers that still map it keep a valid mapping until
+    they let it go). Server processes forked after the block was built share
+    it, and only the process that created it unlinks it.
+    """
+
+    def __init__(self, catalog, shards):
+        arrays = CatalogArrays.for_catalog(catalog)
+        self.size = arrays.size
+        self.skill_levels = arrays.skill_levels
+        self.use_case_ids = {key: tag_id for tag_id, key in enumerate(arrays.use_case_postings)}
+        self.pain_point_ids = {key: tag_id for tag_id, key in enumerate(arrays.pain_point_postings)}
+        shards = max(1, min(shards, self.size))
+        self.bounds = [self.size * shard // shards for shard in range(shards + 1)]
+
+        # Lay out every shard's arrays back to back, 8-byte aligned
+        shard_arrays = [self._shard_arrays(arrays, start, end)
+                        for start, end in zip(self.bounds, self.bounds[1:])]
+        self.layouts = []
+        offset = 0
+        for named in shard_arrays:
+            layout = {}
+            for name, array in named.items():
+                layout[name] = (array.dtype.str, offset, len(array))
+                offset += -(-array.nbytes // 8) * 8
+            self.layouts.append(layout)
+
+        self.memory = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.name = self.memory.name
+        self._finalizer = weakref.finalize(self, _release, self.memory, os.getpid())
+        for layout, named in zip(self.layouts, shard_arrays):
+            for name, array in named.items():
+                dtype, start, length = layout[name]
+                np.ndarray((length,), dtype=dtype, buffer=self.memory.buf, offset=start)[:] = array
+
+    @staticmethod
+    def _shard_arrays(arrays, start, end):
+        def csr(postings):
+            indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+            pieces = []
+            for tag_id, positions in enumerate(postings.values()):
+                # Postings are sorted, so the shard's part is one slice
+                low, high = np.searchsorted(positions, (start, end))
+                pieces.append(positions[low:high] - start)
+                indptr[tag_id + 1] = indptr[tag_id] + high - low
+            indices = np.concatenate(pieces).astype(np.int32) if pieces else np.zeros(0, dtype=np.int32)
+            return indptr, indices
+
+        use_case_indptr, use_case_indices = csr(arrays.use_case_postings)
+        pain_point_indptr, pain_point_indices = csr(arrays.pain_point_postings)
+        return {
+            'skill_codes': arrays.skill_codes[start:end],
+            'use_case_indptr': use_case_indptr,
+            'use_case_indices': use_case_indices,
+            'pain_point_indptr': pain_point_indptr,
+            'pain_point_indices': pain_point_indices
+        }
+
+    @classmethod
+    def for_catalog(cls, catalog, shards):
+        key = ('shared_catalog', shards)
+        shared = catalog.derived.get(key)
+        if shared is None:
+            shared = catalog.derived[key] = cls(catalog, shards)
+        return shared
+
+
+def _release(memory, owner_pid):
+    memory.close()
+    if os.getpid() != owner_pid:
+        return
+    try:
+        memory.unlink()
+    except FileNotFoundError:
+        pass
+
+
+# Worker side: blocks mapped by this worker, most recently used last
+_attached = OrderedDict()
+ATTACHED_BLOCKS = 2
+
+
+def _shard(name, index, layout, skill_levels):
+    entry = _attached.get(name)
+    if entry is None:
+        # Spawned workers share the parent's resource tracker, which already
+        # tracks the block, so attaching does not make this worker an owner
+        memory = shared_memory.SharedMemory(name=name)
+        entry = _attached[name] = (memory, {})
+        while len(_attached) > ATTACHED_BLOCKS:
+            _, (old_memory, old_shards) = _attached.popitem(last=False)
+            old_shards.clear()
+            try:
+                old_memory.close()
+            except BufferError:  # a view is still referenced somewhere; the mapping goes with the process
+                pass
+    else:
+        _attached.move_to_end(name)
+    memory, shards = entry
+    shard = shards.get(index)
+    if shard is None:
+        shard = shards[index] = ShardArrays(memory.buf, layout, skill_levels)
+    return shard
+
+
+def score_shard(name, index, layout, skill_levels, start, query, threshold, limit):
+    """Return [(score, position)] of the shard's best `limit` tools above `threshold`, best first."""
+    shard = _shard(name, index, layout, skill_levels)
+    total = shard.total_scores(*query)
+    positions = CatalogArrays.top_positions(total, threshold, limit)
+    return [(int(total[position]), start + position) for position in positions]
+
+
+class ParallelScorer:
+    """
+    Scores catalogs of at least `min_tools` tools across `workers` processes.
+
+    The pool uses the spawn start method (the server process has threads and
+    open database connections that a fork would copy) and is started on first
+    use, separately in every server process. `workers` below 2 disables it.
+    """
+
+    def __init__(self, workers=0, min_tools=500000):
+        self.workers = workers
+        self.min_tools = min_tools
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def init_app(self, app):
+        self.workers = app.config.get('PARALLEL_WORKERS', self.workers)
+        self.min_tools = app.config.get('PARALLEL_MIN_TOOLS', self.min_tools)
+
+    def enabled_for(self, catalog):
+        return self.workers >= 2 and vectorized.available() and len(catalog) >= self.min_tools
+
+    def _pool(self):
+        # A forked server process inherits the executor object but not its workers
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._executor
+
+    def top_positions(self, catalog, exact_use_case, partial_use_cases, pain_point_set, total_challenges,
+                      skill_points, threshold, limit):
+        """
+        Same result as CatalogArrays.top_positions() over the whole catalog.
+
+        Each shard returns its own top `limit` ordered by (score desc,
+        position asc); merging those with the same key yields exactly the
+        global top `limit`. Returns None when anything failed (the shared
+        memory block, the pool or a worker), so the caller can score in
+        process instead.
+        """
+        try:
+            shared = SharedCatalog.for_catalog(catalog, self.workers)
+            query = (
+                shared.use_case_ids.get(exact_use_case),
+                [shared.use_case_ids[use_case] for use_case in partial_use_cases if use_case in shared.use_case_ids],
+                {shared.pain_point_ids[point] for point in pain_point_set if point in shared.pain_point_ids},
+                total_challenges,
+                skill_points
+            )
+            pool = self._pool()
+            futures = [
+                pool.submit(score_shard, shared.name, index, layout, shared.skill_levels,
+                            shared.bounds[index], query, threshold, limit)
+                for index, layout in enumerate(shared.layouts)
+            ]
+            ranked = [future.result() for future in futures]
+        except BrokenProcessPool:
+            logger.exception('Parallel scoring pool failed; scoring in process')
+            with self._lock:
+                self._executor = None
+            return None
+        except Exception:
+            logger.exception('Parallel scoring failed; scoring in process')
+            return None
+        merged = heapq.merge(*ranked, key=lambda item: (-item[0], item[1]))
+        return [position for _, position in itertools.islice(merged, limit)]
+
+    def close(self):
+        if self._executor is not None and self._pid == os.getpid():
+            if sys.version_info >= (3, 9):
+                self._executor.shutdown(wait=True, cancel_futures=True)
+            else:  # cancel_futures is new in Python 3.9
+                self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,165 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Queued after the last row to stop the writer thread
+_STOP = object()
+
+
+class ResponseRecorder:
+    """
+    Write-behind recorder for UserResponse rows.
+
+    Requests hand their rows to `record()` and move on; a background thread
+    bulk-inserts them once `batch_size` rows are waiting or `flush_interval`
+    seconds have passed since the oldest one arrived. Durability modes:
+
+    - 'sync': insert in the calling thread before returning (the old behaviour);
+      a failed insert is raised to the caller
+    - 'batched': queue the rows; when the queue is full, callers wait for room
+    - 'drop': queue the rows; when the queue is full, new rows are dropped
+
+    `writer` is called with a list of row dicts and must insert them in one
+    transaction. When a batch fails, its rows are retried one at a time, so
+    only the rows that cannot be inserted are lost. Pending rows are flushed
+    when the process exits.
+    """
+
+    MODES = ('sync', 'batched', 'drop')
+
+    def __init__(self, writer=None, mode='batched', batch_size=200, flush_interval=0.5, queue_size=10000):
+        self.writer = writer
+        self.configure(mode, batch_size, flush_interval, queue_size)
+        self._counters = {'queued': 0, 'flushed': 0, 'dropped': 0, 'failed': 0}
+        self._counter_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        atexit.register(self.close)
+
+    def configure(self, mode, batch_size, flush_interval, queue_size):
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown response log mode {mode!r}, expected one of {", ".join(self.MODES)}')
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+
+    def init_app(self, app, writer):
+        # Rows queued for a previous application are written to its database first
+        self._stop_thread()
+        self.writer = writer
+        self.configure(
+            app.config.get('RESPONSE_LOG_MODE', self.mode),
+            app.config.get('RESPONSE_LOG_BATCH_SIZE', self.batch_size),
+            app.config.get('RESPONSE_LOG_FLUSH_INTERVAL', self.flush_interval),
+            app.config.get('RESPONSE_LOG_QUEUE_SIZE', self._queue.maxsize)
+        )
+
+    def _count(self, counter, amount):
+        with self._counter_lock:
+            self._counters[counter] += amount
+
+    def _ensure_thread(self):
+        # A forked worker inherits the flag but not the thread, so check the pid too
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, args=(self._queue,), name='response-recorder',
+                                                daemon=True)
+                self._thread.start()
+
+    def _stop_thread(self):
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                self._queue.put(_STOP)
+                self._thread.join()
+            self._thread = None
+
+    def record(self, rows):
+        """Hand rows over for insertion; returns how many were accepted."""
+        if self.mode == 'sync':
+            try:
+                self.writer(rows)
+            except Exception:
+                self._count('failed', len(rows))
+                raise
+            self._count('flushed', len(rows))
+            return len(rows)
+
+        self._ensure_thread()
+        accepted = 0
+        for row in rows:
+            if self.mode == 'drop':
+                try:
+                    self._queue.put_nowait(row)
+                except queue.Full:
+                    continue
+            else:
+                self._queue.put(row)
+            accepted += 1
+        self._count('queued', accepted)
+        self._count('dropped', len(rows) - accepted)
+        return accepted
+
+    def _write(self, rows):
+        try:
+            self.writer(rows)
+        except Exception:
+            if len(rows) == 1:
+                logger.exception('Failed to write a user response: %r', rows[0])
+                self._count('failed', 1)
+                return
+            # The batch was rolled back as a whole: find the rows that cannot be written
+            logger.warning('Failed to write %d user responses; retrying them one at a time', len(rows), exc_info=True)
+            for row in rows:
+                self._write([row])
+        else:
+            self._count('flushed', len(rows))
+
+    def _run(self, rows):
+        stopping = False
+        while not stopping:
+            batch = []
+            row = rows.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if row is _STOP:
+                    stopping = True
+                    rows.task_done()
+                    break
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    break
+                # Wait for more rows until the deadline, then drain whatever is already waiting
+                remaining = deadline - time.monotonic()
+                try:
+                    row = rows.get(timeout=remaining) if remaining > 0 else rows.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+                for _ in batch:
+                    rows.task_done()
+
+    def flush(self):
+        """Block until every queued row has been written (or has failed)."""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        self.flush()
+
+    def stats(self):
+        with self._counter_lock:
+            stats = dict(self._counters)
+        stats['pending'] = self._queue.qsize()
+        stats['mode'] = self.mode
+        return stats
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of recommendation results for one catalog version.
+
+    Entries expire after `ttl` seconds, the least recently used entry is
+    evicted once `max_size` is reached, and the whole cache is dropped as soon
+    as it is asked about a newer catalog version. `max_size` 0 disables it.
+    """
+
+    def __init__(self, max_size=1024, ttl=300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def init_app(self, app):
+        self.max_size = app.config.get('RECOMMENDATION_CACHE_SIZE', self.max_size)
+        self.ttl = app.config.get('RECOMMENDATION_CACHE_TTL', self.ttl)
+        # Results of another application's catalog may carry the same version
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def get(self, key, version):
+        """Return the cached value for `key` under catalog `version`, or None."""
+        if not self.max_size:
+            return None
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self._counters['invalidations'] += 1
+                self._entries.clear()
+                self._version = version
+
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return value
+
+    def put(self, key, version, value):
+        if not self.max_size:
+            return
+        with self._lock:
+            # A result computed against a catalog that has since changed is not kept
+            if version != self._version:
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+        stats['max_size'] = self.max_size
+        return stats
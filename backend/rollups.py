@@ -0,0 +1,172 @@
+"""
+Response counts rolled up from user_responses into hourly and daily buckets.
+
+Every bucket holds the number of responses per role, workflow, skill level
+and individual pain point (a response naming a pain point twice counts
+once), plus the total under dimension 'responses'. The rollups are applied
+from a watermark, the highest user_responses id already counted, in the
+same transaction that advances it, so each row is counted exactly once
+whether it arrives through the response recorder or a backfill.
+"""
+import json
+from collections import Counter
+from datetime import datetime, timedelta
+
+# Characters of a stored created_at ("YYYY-MM-DD HH:MM:SS.ffffff") kept per bucket
+GRANULARITIES = {'hour': 13, 'day': 10}
+DIMENSIONS = ['role', 'workflow', 'skill_level', 'pain_point']
+TOTAL = 'responses'
+
+
+def install_rollups(connection):
+    connection.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS response_rollups ('
+        'granularity TEXT NOT NULL, dimension TEXT NOT NULL, bucket TEXT NOT NULL, value TEXT NOT NULL, '
+        'count INTEGER NOT NULL, PRIMARY KEY (granularity, dimension, bucket, value)) WITHOUT ROWID'
+    )
+    connection.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS response_rollup_watermark ('
+        'id INTEGER PRIMARY KEY CHECK (id = 1), last_response_id INTEGER NOT NULL)'
+    )
+    connection.exec_driver_sql('INSERT OR IGNORE INTO response_rollup_watermark (id, last_response_id) VALUES (1, 0)')
+
+
+def bucket_start(created_at, granularity):
+    """The ISO start of the bucket holding a stored created_at value."""
+    prefix = created_at[:GRANULARITIES[granularity]]
+    if granularity == 'hour':
+        return f'{prefix[:10]}T{prefix[11:]}:00:00'
+    return f'{prefix}T00:00:00'
+
+
+def _pain_points(raw):
+    try:
+        points = json.loads(raw)
+    except (TypeError, ValueError):
+        return set()
+    if not isinstance(points, list):
+        return set()
+    return {point.strip() for point in points if isinstance(point, str) and point.strip()}
+
+
+def _count(rows):
+    counts = Counter()
+    for role, workflow, skill_level, pain_points, created_at in rows:
+        if not created_at:
+            continue
+        values = [(TOTAL, ''), ('role', role.strip()), ('workflow', workflow.strip()),
+                  ('skill_level', skill_level.strip())]
+        values += [('pain_point', point) for point in _pain_points(pain_points)]
+        for granularity in GRANULARITIES:
+            bucket = bucket_start(created_at, granularity)
+            for dimension, value in values:
+                counts[(granularity, dimension, bucket, value)] += 1
+    return counts
+
+
+def apply_pending(connection, chunk_size=None):
+    """
+    Count the user_responses rows above the watermark and advance it.
+
+    Must run inside the caller's write transaction (for the recorder, the one
+    that inserted the rows). With `chunk_size`, at most that many rows are
+    taken. Returns how many rows were counted.
+    """
+    last_id = read_watermark(connection)
+    query = ('SELECT id, role, workflow, skill_level, pain_points, created_at '
+             'FROM user_responses WHERE id > ? ORDER BY id')
+    parameters = (last_id,)
+    if chunk_size:
+        query += ' LIMIT ?'
+        parameters += (chunk_size,)
+    rows = connection.exec_driver_sql(query, parameters).fetchall()
+    if not rows:
+        return 0
+
+    counts = _count(row[1:] for row in rows)
+    if counts:
+        connection.exec_driver_sql(
+            'INSERT INTO response_rollups (granularity, dimension, bucket, value, count) VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT (granularity, dimension, bucket, value) DO UPDATE SET count = count + excluded.count',
+            [key + (count,) for key, count in counts.items()]
+        )
+    connection.exec_driver_sql(
+        'UPDATE response_rollup_watermark SET last_response_id = ? WHERE id = 1', (rows[-1][0],)
+    )
+    return len(rows)
+
+
+def backfill(engine, chunk_size=5000):
+    """Count every row not yet rolled up, `chunk_size` rows per transaction. Returns the number counted."""
+    total = 0
+    while True:
+        with engine.begin() as connection:
+            counted = apply_pending(connection, chunk_size)
+        total += counted
+        if counted < chunk_size:
+            return total
+
+
+def parse_time(value):
+    """Parse an ISO date or date and time (naive, UTC); raises ValueError."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    return parsed
+
+
+def floor_time(moment, granularity):
+    if granularity == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def step(granularity):
+    return timedelta(hours=1) if granularity == 'hour' else timedelta(days=1)
+
+
+class StatsQuery:
+    """
+    Counts over the buckets of `granularity` that overlap [start, end).
+
+    `start` and `end` are naive UTC datetimes; the range is widened to whole
+    buckets, since the rollups cannot split one.
+    """
+
+    def __init__(self, granularity, start, end):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+        if end <= start:
+            raise ValueError('from must be before to')
+        self.granularity = granularity
+        self.start = floor_time(start, granularity)
+        self.end = floor_time(end, granularity)
+        if self.end < end:
+            self.end += step(granularity)
+
+    @property
+    def buckets(self):
+        return (self.end - self.start) // step(self.granularity)
+
+    def series(self, connection, dimension=TOTAL, value=''):
+        """[(bucket, count)] of one dimension value, for the buckets that have any."""
+        return connection.exec_driver_sql(
+            'SELECT bucket, count FROM response_rollups '
+            'WHERE granularity = ? AND dimension = ? AND value = ? AND bucket >= ? AND bucket < ? ORDER BY bucket',
+            (self.granularity, dimension, value, self.start.isoformat(), self.end.isoformat())
+        ).fetchall()
+
+    def top(self, connection, dimension, limit):
+        """[(value, count)] of a dimension's `limit` most frequent values over the range."""
+        return connection.exec_driver_sql(
+            'SELECT value, SUM(count) AS total FROM response_rollups '
+            'WHERE granularity = ? AND dimension = ? AND bucket >= ? AND bucket < ? '
+            'GROUP BY value ORDER BY total DESC, value LIMIT ?',
+            (self.granularity, dimension, self.start.isoformat(), self.end.isoformat(), limit)
+        ).fetchall()
+
+
+def read_watermark(connection):
+    return connection.exec_driver_sql(
+        'SELECT last_response_id FROM response_rollup_watermark WHERE id = 1'
+    ).scalar()
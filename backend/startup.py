@@ -0,0 +1,58 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """
+    How long each phase of starting this process took, and whether it is ready.
+
+    A process is ready unless a warm-up is running (begin_warm_up() until
+    mark_ready()); /api/health answers 503 meanwhile, so a load balancer only
+    sends traffic to workers whose catalog and indexes are built.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.ready = True
+        self.ready_at = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        logger.info('Startup: %s took %.1f ms', name, seconds * 1000)
+
+    def begin_warm_up(self):
+        self.ready = False
+
+    def mark_ready(self):
+        self.ready = True
+        self.ready_at = time.time()
+        logger.info('Ready after %.1f ms of start-up (pid %d)', self.total() * 1000, os.getpid())
+
+    def total(self):
+        with self._lock:
+            return sum(self.phases.values())
+
+    def as_dict(self):
+        with self._lock:
+            phases = {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()}
+        return {
+            'ready': self.ready,
+            'pid': os.getpid(),
+            'phases_ms': phases,
+            'total_ms': round(sum(phases.values()), 1)
+        }
@@ -0,0 +1,79 @@
+from sqlalchemy import select
+from models import db, AITool, TAG_FIELDS, load_tags
+
+# Fields of the API representation of a tool, in to_dict() order
+TOOL_FIELDS = [
+    'id', 'name', 'description', 'category', 'target_roles', 'skill_level',
+    'use_cases', 'pain_points', 'pricing_model', 'official_url', 'features', 'rating'
+]
+FILTER_FIELDS = ['category', 'pricing_model', 'skill_level']
+
+
+class ToolListing:
+    """
+    Keyset-paginated reads of the tools table.
+
+    Only the requested columns are selected and only the requested tag tables
+    are queried, for one page of ids at a time, so the cost of a page does not
+    depend on the size of the catalog. Pages are ordered by id; `after` is the
+    last id of the previous page.
+
+    `filters` maps FILTER_FIELDS to lists of accepted values (an empty or
+    missing list means no filter on that field).
+    """
+
+    def __init__(self, fields=None, filters=None):
+        fields = list(fields or TOOL_FIELDS)
+        unknown = [field for field in fields if field not in TOOL_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown field: {unknown[0]}. Available fields: {', '.join(TOOL_FIELDS)}")
+        self.fields = [field for field in TOOL_FIELDS if field in fields]
+        self.tag_fields = [field for field in self.fields if field in TAG_FIELDS]
+        columns = ['id'] + [field for field in self.fields if field not in TAG_FIELDS and field != 'id']
+        self._columns = [AITool.__table__.c[column] for column in columns]
+        self._filters = [
+            AITool.__table__.c[field].in_(values)
+            for field, values in (filters or {}).items() if values
+        ]
+
+    def page(self, after=0, limit=100):
+        """Return (tools, next_after); next_after is None on the last page."""
+        statement = (
+            select(*self._columns)
+            .where(AITool.__table__.c.id > after, *self._filters)
+            .order_by(AITool.__table__.c.id)
+            .limit(limit + 1)
+        )
+        rows = db.session.execute(statement).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        tags = load_tags([row.id for row in rows], self.tag_fields) if self.tag_fields else {}
+        tools = []
+        for row in rows:
+            values = row._mapping
+            tool_tags = tags.get(row.id)
+            tools.append({
+                field: tool_tags[field] if field in TAG_FIELDS else values[field]
+                for field in self.fields
+            })
+        next_after = rows[-1].id if has_more else None
+        return tools, next_after
+
+    def iter_tools(self, after=0, limit=None, chunk_size=1000):
+        """
+        Yield tools one at a time, reading `chunk_size` rows per query.
+
+        Only one chunk is held in memory; no transaction is kept open between
+        chunks, so a long export does not hold back writers.
+        """
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            tools, after = self.page(after, size)
+            db.session.close()  # end the read transaction before handing out the chunk
+            yield from tools
+            if remaining is not None:
+                remaining -= len(tools)
+            if after is None:
+                return
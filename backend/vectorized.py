@@ -0,0 +1,96 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; RecommendationEngine falls back to the Python path
+    np = None
+
+
+def available():
+    return np is not None
+
+
+class CatalogArrays:
+    """
+    Column-oriented encoding of a CompiledCatalog for batch scoring.
+
+    - skill_codes: one small integer per tool, indexing `skill_levels`
+    - use_case_postings / pain_point_postings: sorted int32 arrays of tool
+      positions per lowercased tag, i.e. the columns of a sparse
+      tool x tag incidence matrix
+
+    Scoring a profile then touches only the postings of the user's workflow
+    matches and pain points plus one gather over the skill codes.
+    """
+
+    def __init__(self, catalog):
+        self.size = len(catalog)
+        self.skill_levels = sorted({tool.skill_level for tool in catalog.tools})
+        codes = {skill: code for code, skill in enumerate(self.skill_levels)}
+        self.skill_codes = np.fromiter(
+            (codes[tool.skill_level] for tool in catalog.tools), dtype=np.int16, count=self.size
+        )
+        self.use_case_postings = {
+            key: np.asarray(positions, dtype=np.int32) for key, positions in catalog.use_case_index.items()
+        }
+        self.pain_point_postings = {
+            key: np.asarray(positions, dtype=np.int32) for key, positions in catalog.pain_point_index.items()
+        }
+
+    @classmethod
+    def for_catalog(cls, catalog):
+        arrays = catalog.derived.get('arrays')
+        if arrays is None:
+            arrays = catalog.derived['arrays'] = cls(catalog)
+        return arrays
+
+    def _postings(self, postings, keys):
+        arrays = [postings[key] for key in keys if key in postings]
+        if not arrays:
+            return None
+        return arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+
+    def total_scores(self, exact_use_case, partial_use_cases, pain_point_set, total_challenges, skill_points):
+        """
+        Compute every tool's total score in one pass.
+
+        `skill_points` maps each entry of `skill_levels` to the skill points the
+        tool earns for this user. Challenge points come from a lookup table
+        filled with Python's round() so they match the scalar scorer exactly.
+        """
+        workflow = np.zeros(self.size, dtype=np.int16)
+        partial = self._postings(self.use_case_postings, partial_use_cases)
+        if partial is not None:
+            workflow[partial] = 25
+        if exact_use_case is not None:
+            workflow[self.use_case_postings[exact_use_case]] = 40
+
+        total = workflow
+        matched = self._postings(self.pain_point_postings, pain_point_set)
+        if total_challenges and matched is not None:
+            counts = np.bincount(matched, minlength=self.size)
+            table = np.array(
+                [round(count / total_challenges * 40) for count in range(len(pain_point_set) + 1)],
+                dtype=np.int16
+            )
+            total = total + table[counts]
+
+        skill_table = np.array([skill_points[skill] for skill in self.skill_levels], dtype=np.int16)
+        return total + skill_table[self.skill_codes]
+
+    @staticmethod
+    def top_positions(total, threshold, limit):
+        """
+        Return positions scoring above `threshold`, best first, at most `limit`.
+
+        Ties are broken by position, the same order a stable sort over the
+        catalog gives. Only the survivors are fully sorted; the rest of the
+        catalog is cut with an O(n) partition.
+        """
+        positions = np.flatnonzero(total > threshold)
+        if limit <= 0 or positions.size == 0:
+            return []
+        # Encode (score desc, position asc) as a single ascending int64 key
+        keys = (np.int64(np.iinfo(np.int16).max) - total[positions]) * np.int64(total.size) + positions
+        if keys.size > limit:
+            keys = keys[np.argpartition(keys, limit - 1)[:limit]]
+        keys.sort()
+        return (keys % total.size).tolist()
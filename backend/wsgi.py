@@ -0,0 +1,18 @@
+"""
+WSGI entry point: the application, created and warmed up on import.
+
+    gunicorn wsgi:application
+
+gunicorn.conf.py preloads this module in the master process, so the
+catalog, its indexes and the pre-rendered responses are built once and
+shared by the forked workers.
+"""
+import time
+
+_started = time.perf_counter()
+
+import app as app_module
+
+app_module.startup_report.record('import', time.perf_counter() - _started)
+application = app_module.create_app()
+app_module.warm_up(application)